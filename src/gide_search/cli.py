@@ -1,20 +1,22 @@
-"""CLI for gide-search data transformation pipeline."""
+"""
+CLI for gide-search data transformation pipeline.
+
+Heavy dependencies (elasticsearch, pydantic models, pyld, the ontology and http clients)
+are imported inside the commands that use them, so --help and unrelated commands start quickly.
+"""
 
-import json
 import logging
+import os
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
 
-import httpx
+import orjson
 import typer
-from pydantic import ValidationError
 from tqdm import tqdm
 
-from gide_search.search.indexer import DatabaseEntryIndexer
-
-from .transformers import BIAROCrateTransformer, ROCrateIndexTransformer
-from .utils.fetch_ro_crate import ROCrateFetcher
-from .utils.ontology_term_finder import OntologyTermFinder
-
 logger = logging.getLogger()
 
 fetch_ro_crate = typer.Typer(
@@ -50,8 +52,83 @@ def write_rocrate(
         else "ro-crate-metadata.json"
     )
     metadata_path = output_path / ro_metadata_file_name
-    with open(metadata_path, "w") as f:
-        json.dump(ro_crate_metadata, f, indent=2, ensure_ascii=False)
+    with open(metadata_path, "wb") as f:
+        f.write(orjson.dumps(ro_crate_metadata, option=orjson.OPT_INDENT_2))
+
+
+def encode_index_document(dataset: dict) -> bytes:
+    """Encode an index document as it appears inside the indented index JSON array."""
+    encoded = orjson.dumps(dataset, option=orjson.OPT_INDENT_2)
+    # JSON strings cannot contain raw newlines, so this only re-indents structure
+    return encoded.replace(b"\n", b"\n  ")
+
+
+def write_encoded_index(encoded_datasets: Iterable[bytes], index_path: Path) -> None:
+    """Write documents from encode_index_document as an indented JSON array."""
+    with open(index_path, "wb") as f:
+        f.write(b"[")
+        written = False
+        for encoded in encoded_datasets:
+            f.write(b",\n  " if written else b"\n  ")
+            f.write(encoded)
+            written = True
+        f.write(b"\n]" if written else b"]")
+
+
+def _iter_rocrate_files(directory: Path) -> Iterator[Path]:
+    """
+    Find detached ro-crate metadata files anywhere below a directory.
+
+    Walks with os.scandir, which gets file types from the directory listing instead of a
+    stat per path, and skips hidden directories such as .git.
+    """
+    pending: list[str | Path] = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith("."):
+                        pending.append(entry.path)
+                elif entry.name.endswith("-ro-crate-metadata.json") and entry.is_file():
+                    yield Path(entry.path)
+
+
+# Per-process transformer for transform_to_index workers, set up by _init_index_transformer
+_index_transformer = None
+
+
+def _init_index_transformer() -> None:
+    global _index_transformer
+    from .transformers import ROCrateIndexTransformer
+
+    _index_transformer = ROCrateIndexTransformer()
+
+
+def _transform_rocrate_file(
+    metadata_file: Path,
+) -> tuple[tuple[str, bytes] | None, str | None, str | None]:
+    """
+    Transform one ro-crate file into an encoded index document.
+
+    Returns ((datePublished, encoded document), validation error, other error). The
+    document is encoded straight away, so only compact bytes are sent back from worker
+    processes and held until the index is written; errors are strings for the same reason.
+    """
+    from pydantic import ValidationError
+
+    try:
+        document = orjson.loads(metadata_file.read_bytes())
+        try:
+            transformed = _index_transformer.transform(document)
+            return (
+                (transformed["datePublished"], encode_index_document(transformed)),
+                None,
+                None,
+            )
+        except ValidationError as e:
+            return None, str(e), None
+    except Exception as e:
+        return None, None, f"Error transforming {metadata_file}: {e}"
 
 
 @data.command(
@@ -68,13 +145,19 @@ def transform_to_index(
         "-o",
         help="Path to write a json file to later index.",
     ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        help="Number of processes transforming ro-crates in parallel. Each process makes its own ontology lookups, so more workers means more requests to OLS.",
+    ),
 ):
     path = Path(input_path)
 
     metadata_files = []
 
     if path.is_dir():
-        metadata_files = list(path.glob("**/*-ro-crate-metadata.json"))
+        metadata_files = list(_iter_rocrate_files(path))
     else:
         raise ValueError(
             f"Path must be a ro-crate-metadata.json file or directory: {path}"
@@ -83,27 +166,45 @@ def transform_to_index(
     if not metadata_files:
         raise ValueError(f"No ro-crate-metadata.json files found in {path}")
 
-    transformer = ROCrateIndexTransformer()
-    results: list[dict] = []
-    for metadata_file in tqdm(sorted(metadata_files), desc="Transforming RO-Crates"):
-        try:
-            with open(metadata_file) as f:
-                document = json.load(f)
-            try:
-                transformed = transformer.transform(document)
-            except ValidationError as e:
-                logger.error(e)
-                continue
-
-            results.append(transformed)
-        except Exception as e:
-            typer.echo(f"Error transforming {metadata_file}: {e}", err=True)
+    # Framing and validation are pure Python, so files are spread over processes. Each
+    # process sets up its own transformer and ontology lookup caches.
+    metadata_files = sorted(metadata_files)
+    # Each worker sets up its own transformer, which queries OLS, so don't start more
+    # workers than there are files
+    workers = min(workers, len(metadata_files))
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_index_transformer
+        )
+        transformed_files = executor.map(
+            _transform_rocrate_file, metadata_files, chunksize=8
+        )
+    else:
+        _init_index_transformer()
+        transformed_files = map(_transform_rocrate_file, metadata_files)
 
-    results.sort(key=lambda item: item["datePublished"], reverse=True)
+    results: list[tuple[str, bytes]] = []
+    try:
+        for transformed, validation_error, error in tqdm(
+            transformed_files, total=len(metadata_files), desc="Transforming RO-Crates"
+        ):
+            if validation_error:
+                logger.error(validation_error)
+            elif error:
+                typer.echo(error, err=True)
+            else:
+                results.append(transformed)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    results.sort(key=lambda item: item[0], reverse=True)
 
     output_path.mkdir(parents=True, exist_ok=True)
-    with open(output_path / DEFAULT_INDEX_FILE, "w") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    write_encoded_index(
+        (encoded for _, encoded in results), output_path / DEFAULT_INDEX_FILE
+    )
 
     typer.echo(
         f"Created indexable document containing {len(results)} datasets from {len(metadata_files)} ro-crates."
@@ -139,6 +240,12 @@ def generate_bia_rocrate(
         help="Check that the resulting ro-crate can be converted to an index before writing.",
     ),
 ):
+    import httpx
+    from pydantic import ValidationError
+
+    from .transformers import BIAROCrateTransformer, ROCrateIndexTransformer
+    from .utils.ontology_term_finder import OntologyTermFinder
+
     bia_api_url = "https://alpha.bioimagearchive.org/search/v1/search/fts"
 
     query = ""
@@ -153,40 +260,51 @@ def generate_bia_rocrate(
     if require_indexable:
         index_transformer = ROCrateIndexTransformer()
 
-    while True:
+    def fetch_page(client, page: int) -> list[dict]:
         params = {
             "query": query,
             "pagination.page_size": page_size,
             "pagination.page": page,
         }
-
-        response = httpx.get(bia_api_url, params=params, timeout=30.0)
+        response = client.get(bia_api_url, params=params)
         response.raise_for_status()
-
-        data = response.json().get("hits", {}).get("hits", [])
-
-        if not data:
-            break
-
-        for hit in tqdm(data, desc=f"Generating BIA RO-Crates for page: {page}"):
-            source = hit["_source"]
-            if not source["dataset"]:
-                continue
-            detached_metadata = transformer.transform(source)
-
-            if require_indexable and index_transformer:
-                try:
-                    index_transformer.transform(detached_metadata)
-                except ValidationError as e:
-                    logger.error(e)
+        return response.json().get("hits", {}).get("hits", [])
+
+    # One client keeps the connection to the API open across pages, and the next page
+    # is fetched in the background while the current one is transformed.
+    with (
+        httpx.Client(timeout=30.0) as client,
+        ThreadPoolExecutor(max_workers=1) as executor,
+    ):
+        next_page = executor.submit(fetch_page, client, page)
+        while True:
+            data = next_page.result()
+
+            if not data:
+                break
+
+            if page + 1 != end_page:
+                next_page = executor.submit(fetch_page, client, page + 1)
+
+            for hit in tqdm(data, desc=f"Generating BIA RO-Crates for page: {page}"):
+                source = hit["_source"]
+                if not source["dataset"]:
                     continue
+                detached_metadata = transformer.transform(source)
 
-            write_rocrate(detached_metadata, output_path, source["accession_id"])
-            total_processed += 1
+                if require_indexable and index_transformer:
+                    try:
+                        index_transformer.validate(detached_metadata)
+                    except ValidationError as e:
+                        logger.error(e)
+                        continue
 
-        page += 1
-        if page == end_page:
-            break
+                write_rocrate(detached_metadata, output_path, source["accession_id"])
+                total_processed += 1
+
+            page += 1
+            if page == end_page:
+                break
 
     typer.echo(f"Processed {total_processed} datasets from BIA API")
 
@@ -218,25 +336,115 @@ def index(
         "--ca-certs",
         help="Path to the CA certs for ES",
     ),
+    threads: int = typer.Option(
+        4,
+        "--threads",
+        help="Number of threads sending bulk requests",
+    ),
+    chunk_size: int = typer.Option(
+        500,
+        "--chunk-size",
+        help="Documents per bulk request; keep below max chunk bytes / average document size",
+    ),
+    max_chunk_bytes: int = typer.Option(
+        50 * 1024 * 1024,
+        "--max-chunk-bytes",
+        help="Maximum size in bytes of a single bulk request",
+    ),
+    refresh_interval: str | None = typer.Option(
+        None,
+        "--refresh-interval",
+        help="Index refresh interval, e.g. 30s (the index default). Each refresh clears the search request cache.",
+    ),
 ) -> None:
     """Index study data into ElasticSearch."""
-    indexer = DatabaseEntryIndexer(es_url=es_url, api_key=api_key, ca_certs=ca_certs)
+    from gide_search.search.indexer import BulkOptions, DatabaseEntryIndexer
+
+    # Each bulk thread needs its own connection
+    indexer = DatabaseEntryIndexer(
+        es_url=es_url,
+        api_key=api_key,
+        ca_certs=ca_certs,
+        connections_per_node=max(10, threads),
+    )
 
     if not indexer.ping():
         typer.echo("Error: Cannot connect to ElasticSearch", err=True)
         raise typer.Exit(1)
 
-    indexer.create_index(delete_existing=recreate)
+    indexer.create_index(delete_existing=recreate, refresh_interval=refresh_interval)
 
-    if input_path.is_dir():
-        success, errors = indexer.index_from_directory(input_path)
-    else:
-        success, errors = indexer.index_from_file(input_path)
+    bulk_options = BulkOptions(
+        thread_count=threads,
+        chunk_size=chunk_size,
+        max_chunk_bytes=max_chunk_bytes,
+    )
+    with indexer.bulk_load():
+        if input_path.is_dir():
+            success, errors = indexer.index_from_directory(input_path, bulk_options)
+        else:
+            success, errors = indexer.index_from_file(input_path, bulk_options)
 
     typer.echo(f"Indexed {success} studies ({errors} errors)")
+    # bulk_load refreshes the index once loading is done
     typer.echo(f"Total documents in index: {indexer.get_count()}")
 
 
+@data.command(
+    help="Summarise an index document by publisher, license, organism and imaging method."
+)
+def stats(
+    input_path: Path = typer.Argument(
+        DEFAULT_INDEX_DIRECTORY / DEFAULT_INDEX_FILE,
+        help="Path to the JSON index document",
+        exists=True,
+    ),
+    limit: int = typer.Option(
+        10,
+        "--limit",
+        "-n",
+        help="Number of most common values to show per field",
+    ),
+) -> None:
+    import ijson
+
+    publishers: Counter[str] = Counter()
+    licenses: Counter[str] = Counter()
+    organisms: Counter[str] = Counter()
+    imaging_methods: Counter[str] = Counter()
+
+    total = 0
+    # Stream the documents so memory use does not grow with the size of the index file
+    with open(input_path, "rb") as f:
+        for dataset in ijson.items(f, "item"):
+            total += 1
+            publishers[(dataset.get("publisher") or {}).get("name", "Unknown")] += 1
+            licenses[dataset.get("license") or "Unknown"] += 1
+            organisms.update(
+                {
+                    taxon.get("name") or taxon["id"]
+                    for taxon in dataset.get("taxon_ids", [])
+                }
+            )
+            imaging_methods.update(
+                {
+                    method.get("name") or method["id"]
+                    for method in dataset.get("imaging_method_ids", [])
+                }
+            )
+
+    typer.echo(f"{total} datasets in {input_path}\n")
+    for title, counter in (
+        ("Publishers", publishers),
+        ("Licenses", licenses),
+        ("Organisms", organisms),
+        ("Imaging methods", imaging_methods),
+    ):
+        typer.echo(f"  {title}:")
+        for key, count in counter.most_common(limit):
+            typer.echo(f"    {key}: {count}")
+
+
 @app.command(help="Search indexed studies directly from elasticsearch.")
 def search(
     query: str = typer.Argument(..., help="Search query"),
@@ -263,6 +471,12 @@ def search(
         "-f",
         help="Use faceted search with aggregations from the indexer",
     ),
+    all_results: bool = typer.Option(
+        False,
+        "--all",
+        "-a",
+        help="Page through every result instead of stopping at --limit; with --raw, hits are printed as JSON lines",
+    ),
     organisms: list[str] | None = typer.Option(
         None,
         "--organism",
@@ -308,12 +522,32 @@ def search(
         help="Path to the CA certs for ES",
     ),
 ) -> None:
+    from gide_search.search.indexer import DatabaseEntryIndexer
+
     indexer = DatabaseEntryIndexer(es_url=es_url, api_key=api_key, ca_certs=ca_certs)
 
     if not indexer.ping():
         typer.echo("Error: Cannot connect to ElasticSearch", err=True)
         raise typer.Exit(1)
 
+    if all_results:
+        if faceted:
+            typer.echo("Error: --all cannot be combined with --faceted", err=True)
+            raise typer.Exit(1)
+
+        # Pages are fetched with a point in time as they are printed, so any number of
+        # results can be listed without deep from/size paging
+        total = 0
+        for hit in indexer.iter_search(query, short_description=not raw):
+            total += 1
+            if raw:
+                typer.echo(orjson.dumps(hit).decode())
+            else:
+                fancy_format_hit(hit, "_source", "_score")
+        # Keep stdout to JSON lines for --raw
+        typer.echo(f"Found {total} results", err=raw)
+        return
+
     if faceted:
         results = indexer.faceted_search(
             query=query,
@@ -325,9 +559,11 @@ def search(
             date_to=date_to,
             size=limit,
             require_thumbnail=require_thumbnail,
+            # The listing only shows the start of each description
+            short_description=not raw,
         )
     else:
-        results = indexer.search(query, size=limit)
+        results = indexer.search(query, size=limit, short_description=not raw)
 
     hits = results.get("hits", {}).get("hits", [])
 
@@ -340,9 +576,13 @@ def search(
     typer.echo(f"Found {total} results\n")
 
     if raw:
-        typer.echo(json.dumps(results.raw, indent=2))
+        typer.echo(orjson.dumps(results.raw, option=orjson.OPT_INDENT_2).decode())
         if faceted:
-            typer.echo(json.dumps(results.get("aggregations"), indent=2))
+            typer.echo(
+                orjson.dumps(
+                    results.get("aggregations"), option=orjson.OPT_INDENT_2
+                ).decode()
+            )
         return
 
     for hit in hits:
@@ -412,6 +652,8 @@ def search_api(
     ),
 ) -> None:
 
+    import httpx
+
     url = f"{api_url.rstrip('/')}/search"
     params = {"q": query, "size": limit, "offset": 0}
 
@@ -426,6 +668,9 @@ def search_api(
         params["publisher"] = publishers
     if require_thumbnail:
         params["require_thumbnail"] = True
+    if not raw:
+        # The listing only shows the start of each description
+        params["short_description"] = True
 
     # API expects year_from/year_to as integers; extract year if full dates provided
     if year_from:
@@ -446,13 +691,13 @@ def search_api(
         typer.echo(f"Error contacting API at {url}: {e}", err=True)
         raise typer.Exit(1)
 
-    data = resp.json()
+    data = orjson.loads(resp.content)
 
     total = data.get("total") or data.get("total", 0)
     typer.echo(f"Found {total} results\n")
 
     if raw:
-        typer.echo(json.dumps(data, indent=2, ensure_ascii=False))
+        typer.echo(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
         return
 
     hits = data.get("hits", [])
@@ -469,26 +714,17 @@ def fancy_format_hit(hit: dict, source_field: str, score_field: str):
     entry_id = source.get("id") or source.get("identifier") or "unknown"
     typer.echo(f"[{score:.2f}] {entry_id}")
     typer.echo(f"  {name[:80]}")
-    if source.get("description"):
-        typer.echo(f"  {source['description'][:80]}...")
+    description = source.get("description_short") or source.get("description")
+    if description:
+        typer.echo(f"  {description[:80]}...")
     typer.echo()
 
 
 def fancy_format_aggregations(facet_aggregataions: dict, count_field: str):
     typer.echo("Facets:")
+    print_facet_list(facet_aggregataions, "organisms", "Organisms", count_field)
     print_facet_list(
-        facet_aggregataions,
-        "organisms",
-        "Organisms",
-        count_field,
-        nested_field_name="taxon_ids",
-    )
-    print_facet_list(
-        facet_aggregataions,
-        "imaging_methods",
-        "Imaging methods",
-        count_field,
-        nested_field_name="imaging_method_ids",
+        facet_aggregataions, "imaging_methods", "Imaging methods", count_field
     )
     print_facet_list(facet_aggregataions, "publishers", "Publisher", count_field)
     print_facet_list(
@@ -503,16 +739,12 @@ def print_facet_list(
     title: str,
     count_field: str,
     limit: int = 20,
-    nested_field_name: str | None = None,
 ) -> None:
 
     buckets = facet_aggs.get(field_name)
 
     if isinstance(buckets, dict):
-        if nested_field_name:
-            buckets = buckets.get(nested_field_name, {}).get("buckets")
-        else:
-            buckets = buckets.get("buckets")
+        buckets = buckets.get("buckets")
 
     if isinstance(buckets, list) and len(buckets) > 0:
         typer.echo(f"  {title}:")
@@ -524,7 +756,12 @@ def print_facet_list(
                 )
 
 
-@app.command(help="Run the api.")
+@app.command(
+    help=(
+        "Run the api. Elasticsearch connection is configured from the environment: "
+        "ES_URL, ES_API_KEY, ES_CA_CERT and ES_MAX_REQUESTS (connection pool size, default 64)."
+    )
+)
 def serve(
     host: str = typer.Option(
         "127.0.0.1",
@@ -542,16 +779,26 @@ def serve(
         "--reload",
         help="Enable auto-reload for development",
     ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        help="Number of worker processes. Each worker has its own Elasticsearch connection pool. Ignored with --reload.",
+    ),
 ) -> None:
     import uvicorn
 
     typer.echo(f"Starting server at http://{host}:{port}")
     typer.echo(f"API docs available at http://{host}:{port}/docs")
+    # "auto" picks uvloop and httptools (installed with uvicorn[standard]) where the platform supports them
     uvicorn.run(
         "gide_search.search.api:app",
         host=host,
         port=port,
         reload=reload,
+        workers=workers,
+        loop="auto",
+        http="auto",
     )
 
 
@@ -568,6 +815,7 @@ def bia(
         help="Path to write ro-crate-files.",
     ),
 ):
+    from .utils.fetch_ro_crate import ROCrateFetcher
 
     pbar = tqdm(total=0)
     progress = lambda current, total: progress_tracking(current, total, pbar)
@@ -583,6 +831,8 @@ def idr(
         help="Path to write ro-crate-files.",
     ),
 ):
+    from .utils.fetch_ro_crate import ROCrateFetcher
+
     pbar = tqdm(total=0)
     progress = lambda current, total: progress_tracking(current, total, pbar)
 
@@ -597,6 +847,8 @@ def ssbd(
         help="Path to write ro-crate-files.",
     ),
 ):
+    from .utils.fetch_ro_crate import ROCrateFetcher
+
     pbar = tqdm(total=0)
     progress = lambda current, total: progress_tracking(current, total, pbar)
 
@@ -604,6 +856,38 @@ def ssbd(
     fetcher.fetch_ssbd_ro_crates(output_path, progress_callback=progress)
 
 
+@fetch_ro_crate.command(
+    name="all", help="Download BIA, IDR and SSBD ro-crates concurrently."
+)
+def fetch_all(
+    output_path: Path = typer.Argument(
+        DEFAULT_RO_CRATE_OUTPUT,
+        help="Path to write ro-crate-files.",
+    ),
+):
+    from .utils.fetch_ro_crate import ROCrateFetcher
+
+    fetcher = ROCrateFetcher()
+    source_fetchers = {
+        "BIA": fetcher.fetch_bia_ro_crates,
+        "IDR": fetcher.fetch_idr_ro_crates,
+        "SSBD": fetcher.fetch_ssbd_ro_crates,
+    }
+
+    # Each source is an independent set of HTTP downloads, so overlap them
+    with ThreadPoolExecutor(max_workers=len(source_fetchers)) as executor:
+        futures = {}
+        for position, (source, fetch) in enumerate(source_fetchers.items()):
+            pbar = tqdm(total=0, desc=source, position=position)
+            progress = partial(progress_tracking, progress_bar=pbar)
+            future = executor.submit(fetch, output_path, progress_callback=progress)
+            futures[future] = source
+
+        for future in as_completed(futures):
+            future.result()
+            typer.echo(f"Finished downloading {futures[future]} ro-crates")
+
+
 def main() -> None:
     app()
 
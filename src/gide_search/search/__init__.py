@@ -21,7 +21,6 @@ __all__ = [
     "Publication",
     "Taxon",
     "BioSample",
-    "Publication",
     "LabProtocol",
     "Dataset",
     "DefinedTerm",
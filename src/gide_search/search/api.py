@@ -1,34 +1,71 @@
 import logging
 import os
 import re
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from typing import Annotated
 from urllib.parse import urlparse
 
 import bidict
+import orjson
+from cachetools import TTLCache
 from fastapi import FastAPI, Query
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel
 
-from .indexer import DatabaseEntryIndexer
-from .schema_search_object import Dataset
+from .indexer import FACET_KEY_SEPARATOR, DatabaseEntryIndexer
+from .schema_search_object import INDEX_ONLY_FIELDS, Dataset
 
 logger = logging.getLogger()
 
 FAST_API_PATH = os.environ.get("FAST_API_PATH", "")
 
+# Initialize indexer from environment or defaults
+ES_URL = os.environ.get("ES_URL", "http://localhost:9200")
+ES_API_KEY = os.environ.get("ES_API_KEY")
+ES_CA_CERT = os.environ.get("ES_CA_CERT")
+# Size of the ES connection pool; should cover the expected number of in-flight requests
+ES_MAX_REQUESTS = int(os.environ.get("ES_MAX_REQUESTS", "64"))
+indexer = DatabaseEntryIndexer(
+    es_url=ES_URL,
+    api_key=ES_API_KEY,
+    ca_certs=ES_CA_CERT,
+    connections_per_node=ES_MAX_REQUESTS,
+)
+
+
+# Raw ES responses for recently seen searches, so repeated identical requests (e.g. the
+# landing page, paging back) skip the round trip. Reindexing happens in a separate
+# process, so the TTL is what bounds how stale a cached response can be.
+SEARCH_CACHE_TTL = int(os.environ.get("SEARCH_CACHE_TTL", "60"))
+search_cache: TTLCache = TTLCache(maxsize=512, ttl=SEARCH_CACHE_TTL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    # The async client keeps a connection pool open on the event loop it was first used on
+    await indexer.close_async()
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson (FastAPI's own ORJSONResponse is deprecated)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
 app = FastAPI(
     title="gide-search",
     description="Unified search API for biological imaging databases",
     version="0.1.0",
-    root_path=FAST_API_PATH
+    root_path=FAST_API_PATH,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
-
-# Initialize indexer from environment or defaults
-ES_URL = os.environ.get("ES_URL", "http://localhost:9200")
-ES_API_KEY = os.environ.get("ES_API_KEY")
-ES_CA_CERT = os.environ.get("ES_CA_CERT")
-indexer = DatabaseEntryIndexer(es_url=ES_URL, api_key=ES_API_KEY, ca_certs=ES_CA_CERT)
+# Search responses are large, repetitive JSON, so compress anything beyond a small payload
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 class FacetBucket(BaseModel):
@@ -107,106 +144,109 @@ def map_licence(input: str, to_url: bool) -> str | None:
 def parse_aggregate(
     aggregations: dict,
     source_key: str,
-    nested_source_key: str | None = None,
     label_mapping_function: Callable[[str], str | None] | None = None,
-) -> list[FacetBucket]:
+) -> list[dict]:
+    """Parse terms/histogram buckets into FacetBucket-shaped dicts."""
     aggs = []
-    if nested_source_key:
-        buckets = (
-            aggregations.get(source_key, {})
-            .get(nested_source_key, {})
-            .get("buckets", [])
-        )
-    else:
-        buckets = aggregations.get(source_key, {}).get("buckets", [])
+    buckets = aggregations.get(source_key, {}).get("buckets", [])
 
     for bucket in buckets:
         key_label = None
 
-        if bucket.get("name"):
-            first_name_hit = next(
-                iter(bucket.get("name", {}).get("hits", {}).get("hits", [])), None
-            )
-            if first_name_hit:
-                key_label = first_name_hit.get("_source", {}).get("name")
-
         if label_mapping_function:
             key_label = label_mapping_function(bucket["key"])
 
-        if key_label:
-            aggs.append(
-                FacetBucket(
-                    key=bucket.get("key_as_string", bucket["key"]),
-                    count=bucket["doc_count"],
-                    label=key_label,
-                )
-            )
+        aggs.append(
+            {
+                "key": bucket.get("key_as_string", bucket["key"]),
+                "count": bucket["doc_count"],
+                "label": key_label or None,
+            }
+        )
+    return aggs
+
 
+def parse_combined_aggregate(aggregations: dict, source_key: str) -> list[dict]:
+    """
+    Parse buckets of an "<id>|<label>" keyword field into FacetBucket-shaped dicts.
+
+    An id indexed with different labels gets one bucket per label from ES; these are
+    merged, which is safe as each document holds a given id only once.
+    """
+    facets: dict[str, dict] = {}
+    for bucket in aggregations.get(source_key, {}).get("buckets", []):
+        key, _, label = bucket["key"].partition(FACET_KEY_SEPARATOR)
+        if key in facets:
+            facets[key]["count"] += bucket["doc_count"]
         else:
-            aggs.append(
-                FacetBucket(
-                    key=bucket.get("key_as_string", bucket["key"]),
-                    count=bucket["doc_count"],
-                )
-            )
-    return aggs
+            facets[key] = {
+                "key": key,
+                "count": bucket["doc_count"],
+                "label": label or None,
+            }
+    return list(facets.values())
 
 
-def parse_es_response(es_response: dict) -> SearchResponse:
-    """Parse ElasticSearch response into API response, returning Dataset objects with score."""
-    # Parse hits - return the source document (Dataset) plus the score
-    hits = []
-    for hit in es_response.get("hits", {}).get("hits", []):
-        entry_hit = {}
-        entry_hit["id"] = hit["_id"]
-        entry_hit["entry"] = hit["_source"]
-        entry_hit["score"] = hit["_score"] or 0.0
+def listing_entry(source: dict) -> dict:
+    """Put a requested description_short in the place of the description it summarises."""
+    if "description_short" not in source:
+        return source
+    entry = dict(source)
+    entry["description"] = entry.pop("description_short")
+    return entry
 
-        # TODO: parse highlight usefully
 
-        try:
-            valid_hit = EntryHit.model_validate(entry_hit, by_name=True, by_alias=False)
-        except ValidationError as e:
-            logging.getLogger().error(entry_hit)
-            raise e
-        hits.append(valid_hit)
+def build_search_payload(es_response: dict) -> dict:
+    """
+    Build the /search response body from an ElasticSearch response.
+
+    The payload has the shape of SearchResponse, but is built from plain dicts: indexed
+    documents were validated as IndexableDataset before indexing, so going through the
+    pydantic models on every search would only add allocations. The models document
+    the response in the OpenAPI schema.
+    """
+    # Hits - return the source document (Dataset) plus the score.
+    # The index-only fields are excluded from _source by the search itself.
+    hits = [
+        {
+            "id": hit["_id"],
+            "entry": listing_entry(hit["_source"]),
+            "score": hit["_score"] or 0.0,
+        }
+        # TODO: parse highlight usefully
+        for hit in es_response.get("hits", {}).get("hits", [])
+    ]
 
     # Parse aggregations for facets
     aggregations = es_response.get("aggregations", {})
 
-    organisms = parse_aggregate(aggregations, "organisms", "taxon_ids")
-    imaging_methods = parse_aggregate(
-        aggregations, "imaging_methods", "imaging_method_ids"
-    )
-    publishers = parse_aggregate(
-        aggregations,
-        "publishers",
-        label_mapping_function=lambda agg_key: map_publisher(agg_key, False),
-    )
-    years = parse_aggregate(aggregations, "year_published")
-    license = parse_aggregate(
-        aggregations,
-        "license",
-        label_mapping_function=lambda agg_key: map_licence(agg_key, False),
-    )
+    facets = None
+    if aggregations:
+        facets = {
+            "publisher": parse_aggregate(
+                aggregations,
+                "publishers",
+                label_mapping_function=lambda agg_key: map_publisher(agg_key, False),
+            ),
+            "organism": parse_combined_aggregate(aggregations, "organisms"),
+            "imaging_method": parse_combined_aggregate(aggregations, "imaging_methods"),
+            "year_published": parse_aggregate(aggregations, "year_published"),
+            "license": parse_aggregate(
+                aggregations,
+                "license",
+                label_mapping_function=lambda agg_key: map_licence(agg_key, False),
+            ),
+        }
 
-    facets = (
-        Facets(
-            publisher=publishers,
-            organism=organisms,
-            imaging_method=imaging_methods,
-            year_published=years,
-            license=license,
-        )
-        if aggregations
-        else None
-    )
+    return {
+        "total": es_response["hits"]["total"]["value"],
+        "hits": hits,
+        "facets": facets,
+    }
 
-    return SearchResponse(
-        total=es_response["hits"]["total"]["value"],
-        hits=hits,
-        facets=facets,
-    )
+
+# Short forms of ontology ids accepted in filters, e.g. "fbbi00000246" or "NCBITaxon_9606"
+SHORT_IDENTIFIER_PATTERN = re.compile(r"^(fbbi|ncbi)\w*?(\d+)$", re.IGNORECASE)
 
 
 def expand_short_identifier(identifiers: list[str]) -> list[str]:
@@ -216,25 +256,29 @@ def expand_short_identifier(identifiers: list[str]) -> list[str]:
             full_indentitifers.append(identifier)
             continue
 
-        match_fbbi = re.match(r"^fbbi\w*?(\d+)$", identifier, re.IGNORECASE)
-        if match_fbbi:
+        match = SHORT_IDENTIFIER_PATTERN.match(identifier)
+        if not match:
+            full_indentitifers.append(identifier)
+        elif match.group(1).lower() == "fbbi":
             full_indentitifers.append(
-                f"http://purl.obolibrary.org/obo/FBbi_{match_fbbi.group(1)}"
+                f"http://purl.obolibrary.org/obo/FBbi_{match.group(2)}"
             )
-            continue
-
-        match_ncbi = re.match(r"^ncbi\w*?(\d+)$", identifier, re.IGNORECASE)
-        if match_ncbi:
+        else:
             full_indentitifers.append(
-                f"http://purl.obolibrary.org/obo/NCBITaxon_{int(match_ncbi.group(1))}"
+                f"http://purl.obolibrary.org/obo/NCBITaxon_{int(match.group(2))}"
             )
-            continue
-
-        full_indentitifers.append(identifier)
 
     return full_indentitifers
 
 
+def search_cache_key(search_params: dict) -> tuple:
+    """Build a hashable key for a search, ignoring the order of multi-valued filters."""
+    return tuple(
+        (name, tuple(sorted(value)) if isinstance(value, list) else value)
+        for name, value in sorted(search_params.items())
+    )
+
+
 SEARCH_QUERY_DESCRIPTION = """
 Search query string.
 
@@ -243,8 +287,13 @@ Supports simple search: Just type words to search across all fields including ti
 """
 
 
-@app.get("/search", response_model=SearchResponse, response_model_by_alias=False)
-def search(
+@app.get(
+    "/search",
+    response_model=SearchResponse,
+    response_model_by_alias=False,
+    response_class=ORJSONResponse,
+)
+async def search(
     q: Annotated[str, Query(description=SEARCH_QUERY_DESCRIPTION)] = "",
     publisher: Annotated[
         list[str] | None, Query(description="Filter by publisher (IDR, SSBD, BIA)")
@@ -267,7 +316,19 @@ def search(
     require_thumbnail: Annotated[
         bool, Query(description="Filter by whether any thumbnails are present.")
     ] = False,
-) -> SearchResponse:
+    fields: Annotated[
+        list[str] | None,
+        Query(
+            description="Only return these fields of each entry, e.g. name, datePublished"
+        ),
+    ] = None,
+    short_description: Annotated[
+        bool,
+        Query(
+            description="Return only the first 500 characters of each entry's description"
+        ),
+    ] = False,
+) -> ORJSONResponse:
     """
     Search studies with optional filters.
 
@@ -286,35 +347,70 @@ def search(
     if license:
         license_urls = [map_licence(l, to_url=True) or l for l in license]
 
-    es_response = indexer.faceted_search(
-        query=q,
-        publishers=publisher_urls,
-        organisms=expand_short_identifier(organism) if organism else None,
-        imaging_methods=(
+    search_params = {
+        "query": q,
+        "publishers": publisher_urls,
+        "organisms": expand_short_identifier(organism) if organism else None,
+        "imaging_methods": (
             expand_short_identifier(imaging_method) if imaging_method else None
         ),
-        licenses=license_urls,
-        date_from=date_from,
-        date_to=date_to,
-        require_thumbnail=require_thumbnail,
-        size=size,
-        from_=offset,
-    )
+        "licenses": license_urls,
+        "date_from": date_from,
+        "date_to": date_to,
+        "require_thumbnail": require_thumbnail,
+        "size": size,
+        "from_": offset,
+        "source_includes": fields,
+        "short_description": short_description,
+    }
+
+    cache_key = search_cache_key(search_params)
+    es_response = search_cache.get(cache_key)
+    if es_response is None:
+        es_response = await indexer.faceted_search_async(**search_params)
+        search_cache[cache_key] = es_response
+
+    # Returning a response directly skips FastAPI validating against response_model,
+    # which is only used for the OpenAPI schema here.
+    return ORJSONResponse(build_search_payload(es_response))
 
-    return parse_es_response(es_response)
+
+# Most entries that can be fetched from /api/entries in one request
+MAX_ENTRIES_PER_REQUEST = 100
 
 
 @app.get("/api/entry/{entry_id:path}")
-def get_entry(entry_id: str) -> dict:
+async def get_entry(entry_id: str) -> dict:
     """Get a single entry by ID."""
-    result = indexer.es.get(index=indexer.index_name, id=entry_id)
+    result = await indexer.async_es.get(
+        index=indexer.index_name,
+        id=entry_id,
+        source_excludes=list(INDEX_ONLY_FIELDS),
+    )
     return result["_source"]
 
 
+@app.get("/api/entries")
+async def get_entries(
+    ids: Annotated[
+        list[str],
+        Query(
+            max_length=MAX_ENTRIES_PER_REQUEST,
+            description=f"Entry IDs to fetch, at most {MAX_ENTRIES_PER_REQUEST}",
+        ),
+    ],
+) -> list[dict]:
+    """Get multiple entries by ID in a single round trip. Unknown IDs are skipped."""
+    result = await indexer.async_es.mget(
+        index=indexer.index_name, ids=ids, source_excludes=list(INDEX_ONLY_FIELDS)
+    )
+    return [doc["_source"] for doc in result["docs"] if doc.get("found")]
+
+
 @app.get("/health")
-def health_check() -> dict:
+async def health_check() -> dict:
     """Check API and ElasticSearch health."""
-    es_ok = indexer.ping()
+    es_ok = await indexer.ping_async()
 
     response = {
         "status": "healthy" if es_ok else "degraded",
@@ -1,18 +1,61 @@
 """ElasticSearch indexer for imaging dataset data."""
 
+import functools
 import json
+import logging
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
-from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
+import ijson
+import orjson
+from elastic_transport import ObjectApiResponse
+from elasticsearch import ApiError, AsyncElasticsearch, Elasticsearch
+from elasticsearch.helpers import parallel_bulk
+from elasticsearch.serializer import OrjsonSerializer
+
+from .schema_search_object import INDEX_ONLY_FIELDS
+
+logger = logging.getLogger("__main__." + __name__)
 
 # Index name
 GIDE_DATASETS_INDEX = "gide-datasets"
 
+
+@dataclass
+class BulkOptions:
+    """
+    Tuning for parallel bulk indexing.
+
+    Chunks are sent by thread_count threads; keep chunk_size below
+    max_chunk_bytes / average document size so the byte limit rarely splits chunks.
+    """
+
+    thread_count: int = 4
+    chunk_size: int = 500
+    max_chunk_bytes: int = 50 * 1024 * 1024
+    queue_size: int = 4
+    # Seconds to wait for each bulk request; large chunks can exceed the client default
+    request_timeout: float = 120
+
+
+# Segments to merge down to after a bulk load
+BULK_LOAD_MAX_SEGMENTS = 5
+
+
+# Length of the description summary that listings can request in place of the description
+DESCRIPTION_SHORT_LENGTH = 500
+
+# Joins a facet id and its label into one keyword, e.g. "<taxon iri>|Mus musculus"
+FACET_KEY_SEPARATOR = "|"
+
 # ElasticSearch mapping for ImagingDatasetSummary documents
 INDEX_MAPPING = {
     "mappings": {
         "dynamic": "false",
+        # The facet keys are derived at index time and only read from doc values
+        "_source": {"excludes": ["taxon_keys", "imaging_method_keys"]},
         "properties": {
             "id": {"type": "keyword"},
             "identifier": {
@@ -27,6 +70,9 @@ INDEX_MAPPING = {
                 "fields": {"keyword": {"type": "keyword"}},
             },
             "description": {"type": "text", "analyzer": "english"},
+            # Never searched; only returned, in place of description, for listings that
+            # ask for short descriptions
+            "description_short": {"type": "text", "index": False},
             "datePublished": {"type": "date"},
             "license": {"type": "keyword"},
             "keywords": {"type": "keyword"},
@@ -119,9 +165,10 @@ INDEX_MAPPING = {
                     "description": {"type": "text"},
                 },
             },
-            # Pre-computed facet IDs for faster filtering and aggregation
+            # Pre-computed facet IDs for faster filtering. Not nested: filters only match
+            # on ids, so flat taxon_ids.id/imaging_method_ids.id keyword arrays suffice
+            # and avoid a hidden nested document per term
             "taxon_ids": {
-                "type": "nested",
                 "properties": {
                     "id": {"type": "keyword"},
                     "scientificName": {
@@ -137,12 +184,14 @@ INDEX_MAPPING = {
                 },
             },
             "imaging_method_ids": {
-                "type": "nested",
                 "properties": {
                     "id": {"type": "keyword"},
                     "name": {"type": "keyword", "index": False, "doc_values": False},
                 },
             },
+            # "<id>|<label>" copies of the facet ids, for flat terms aggregations
+            "taxon_keys": {"type": "keyword"},
+            "imaging_method_keys": {"type": "keyword"},
             # No need to index the urls for search, but used for field exist queries
             "thumbnailUrl": {"type": "keyword", "index": False, "doc_values": True},
         },
@@ -150,6 +199,13 @@ INDEX_MAPPING = {
     "settings": {
         "number_of_shards": 1,
         "number_of_replicas": 0,
+        # Every refresh invalidates the shard request cache that facet aggregations
+        # are served from, and the data only changes on reindex
+        "refresh_interval": "30s",
+        "requests.cache.enable": True,
+        # The index is written once per reindex and read many times, so trade some
+        # indexing CPU for a smaller index that stays in the page cache
+        "codec": "best_compression",
         "analysis": {
             "analyzer": {
                 "english": {
@@ -161,6 +217,41 @@ INDEX_MAPPING = {
 }
 
 
+def _client_options(
+    api_key: str | None, ca_certs: str | None, connections_per_node: int
+) -> dict:
+    # connections_per_node sizes the HTTP connection pool, bounding concurrent in-flight requests
+    client_options: dict = {
+        "ca_certs": ca_certs,
+        "connections_per_node": connections_per_node,
+        # gzip request bodies and accept gzipped responses from ES
+        "http_compress": True,
+        # Bulk actions and search responses are (de)serialized with orjson
+        "serializer": OrjsonSerializer(),
+    }
+    if api_key:
+        client_options["api_key"] = api_key
+    return client_options
+
+
+@functools.cache
+def _get_client(
+    es_url: str, api_key: str | None, ca_certs: str | None, connections_per_node: int
+) -> Elasticsearch:
+    """
+    Return a shared client for the given connection settings.
+
+    The client owns the connection pool, so sharing it between indexers keeps
+    connections (and TLS sessions) warm rather than handshaking again per indexer.
+    A process only connects with a handful of settings, so clients are never evicted
+    and each one stays in use for the life of the process, rather than being dropped
+    from the cache while still open.
+    """
+    return Elasticsearch(
+        es_url, **_client_options(api_key, ca_certs, connections_per_node)
+    )
+
+
 class DatabaseEntryIndexer:
     """Index imaging dataset entry documents into ElasticSearch."""
 
@@ -170,76 +261,251 @@ class DatabaseEntryIndexer:
         index_name: str = GIDE_DATASETS_INDEX,
         api_key: str | None = None,
         ca_certs: str | None = None,
+        connections_per_node: int = 10,
     ):
-        if api_key:
-            self.es = Elasticsearch(es_url, api_key=api_key, ca_certs=ca_certs)
-        else:
-            self.es = Elasticsearch(es_url, ca_certs=ca_certs)
+        self.es = _get_client(es_url, api_key, ca_certs, connections_per_node)
+        self._async_client_settings = (es_url, api_key, ca_certs, connections_per_node)
         self.index_name = index_name
 
+    @functools.cached_property
+    def async_es(self) -> AsyncElasticsearch:
+        """
+        Async client, created on first use so only the API opens one.
+
+        Async clients are bound to the event loop they first run on, so are not shared.
+        """
+        es_url, api_key, ca_certs, connections_per_node = self._async_client_settings
+        return AsyncElasticsearch(
+            es_url, **_client_options(api_key, ca_certs, connections_per_node)
+        )
+
     def ping(self) -> bool:
         """Check if ElasticSearch is available."""
         return self.es.ping()
 
-    def create_index(self, delete_existing: bool = False) -> None:
-        """Create the studies index with proper mapping."""
+    async def ping_async(self) -> bool:
+        """Check if ElasticSearch is available without blocking the event loop."""
+        return await self.async_es.ping()
+
+    async def close_async(self) -> None:
+        """Close the connections held by the async client, if one was created."""
+        async_es = self.__dict__.pop("async_es", None)
+        if async_es is not None:
+            await async_es.close()
+
+    def create_index(
+        self, delete_existing: bool = False, refresh_interval: str | None = None
+    ) -> None:
+        """
+        Create the studies index with proper mapping.
+
+        refresh_interval overrides the mapping default, and is also applied if the
+        index already exists.
+        """
         if self.es.indices.exists(index=self.index_name):
             if delete_existing:
                 self.es.indices.delete(index=self.index_name)
             else:
+                if refresh_interval:
+                    self.es.indices.put_settings(
+                        index=self.index_name,
+                        settings={"refresh_interval": refresh_interval},
+                    )
                 return
 
-        self.es.indices.create(index=self.index_name, body=INDEX_MAPPING)
+        body = INDEX_MAPPING
+        if refresh_interval:
+            body = INDEX_MAPPING | {
+                "settings": INDEX_MAPPING["settings"]
+                | {"refresh_interval": refresh_interval}
+            }
+        self.es.indices.create(index=self.index_name, body=body)
 
     def delete_index(self) -> None:
         """Delete the studies index."""
         if self.es.indices.exists(index=self.index_name):
             self.es.indices.delete(index=self.index_name)
 
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """
+        Disable refreshes and replicas on the index while bulk loading.
+
+        ES otherwise writes a new segment every refresh interval and copies every
+        document to the replicas as it arrives. The previous settings are always
+        restored afterwards. After a successful load the index is refreshed once so the
+        load is searchable, and a merge down to BULK_LOAD_MAX_SEGMENTS segments is
+        started; it runs in the background, as it can take far longer than a request.
+        """
+        settings_keys = ("refresh_interval", "number_of_replicas")
+        current = self.es.indices.get_settings(
+            index=self.index_name, name=[f"index.{key}" for key in settings_keys]
+        )
+        index_settings = current[self.index_name]["settings"].get("index", {})
+        previous = {
+            "refresh_interval": index_settings.get(
+                "refresh_interval", INDEX_MAPPING["settings"]["refresh_interval"]
+            ),
+            "number_of_replicas": index_settings.get(
+                "number_of_replicas", INDEX_MAPPING["settings"]["number_of_replicas"]
+            ),
+        }
+
+        self.es.indices.put_settings(
+            index=self.index_name,
+            settings={"refresh_interval": "-1", "number_of_replicas": 0},
+        )
+        try:
+            yield
+        except BaseException:
+            # Don't let a failure to restore the settings hide why the load failed
+            try:
+                self.es.indices.put_settings(index=self.index_name, settings=previous)
+            except Exception:
+                logger.exception(f"Failed to restore the settings of {self.index_name}")
+            raise
+
+        self.es.indices.put_settings(index=self.index_name, settings=previous)
+        self.es.indices.refresh(index=self.index_name)
+        self.es.indices.forcemerge(
+            index=self.index_name,
+            max_num_segments=BULK_LOAD_MAX_SEGMENTS,
+            wait_for_completion=False,
+        )
+
+    @staticmethod
+    def _facet_keys(terms: Iterable[dict]) -> list[str]:
+        return [
+            f"{term['id']}{FACET_KEY_SEPARATOR}{term.get('name') or ''}"
+            for term in terms
+        ]
+
+    def _prepare_document(self, study: dict) -> dict:
+        """Add fields derived at index time, so they are not recomputed per search."""
+        description = study.get("description") or ""
+        return study | {
+            "description_short": description[:DESCRIPTION_SHORT_LENGTH],
+            "taxon_keys": self._facet_keys(study.get("taxon_ids", ())),
+            "imaging_method_keys": self._facet_keys(
+                study.get("imaging_method_ids", ())
+            ),
+        }
+
     def index_entry(self, study: dict) -> None:
         """Index a single database entry."""
         self.es.index(
             index=self.index_name,
             id=study["id"],
-            document=study,
+            document=self._prepare_document(study),
         )
 
-    def index_entries(self, studies: list[dict]) -> tuple[int, int]:
+    def index_entries(
+        self, studies: Iterable[dict], bulk_options: BulkOptions | None = None
+    ) -> tuple[int, int]:
         """Bulk index multiple documents. Returns (success_count, error_count)."""
+        bulk_options = bulk_options or BulkOptions()
 
-        def generate_actions():
-            for study in studies:
-                yield {
-                    "_index": self.index_name,
-                    "_id": study["id"],
-                    "_source": study,
-                }
-
-        success, errors = bulk(self.es, generate_actions(), raise_on_error=False)
-        error_count = len(errors) if isinstance(errors, list) else 0
-        return success, error_count
-
-    def index_from_file(self, json_path: Path) -> tuple[int, int]:
-        """Load studies from JSON file and index them."""
-        with open(json_path) as f:
-            studies = json.load(f)
-        return self.index_entries(studies)
-
-    def index_from_directory(self, output_dir: Path) -> tuple[int, int]:
-        """Index all JSON files in output directory."""
-        total_success = 0
-        total_errors = 0
+        # Every action line is the same apart from the id, so the header is encoded once
+        # and each action and document is handed to the bulk helper as ready-made bytes
+        header_prefix = (
+            orjson.dumps({"index": {"_index": self.index_name}})[:-2] + b',"_id":'
+        )
 
-        for json_file in output_dir.glob("*.json"):
-            success, errors = self.index_from_file(json_file)
-            total_success += success
-            total_errors += errors
+        def expand_action(study: dict) -> tuple[bytes, bytes]:
+            return (
+                header_prefix + orjson.dumps(study["id"]) + b"}}",
+                orjson.dumps(self._prepare_document(study)),
+            )
 
-        return total_success, total_errors
+        success = 0
+        error_count = 0
+        # Threads overlap encoding one chunk with sending another
+        for ok, _ in parallel_bulk(
+            self.es.options(request_timeout=bulk_options.request_timeout),
+            studies,
+            expand_action_callback=expand_action,
+            thread_count=bulk_options.thread_count,
+            chunk_size=bulk_options.chunk_size,
+            max_chunk_bytes=bulk_options.max_chunk_bytes,
+            queue_size=bulk_options.queue_size,
+            raise_on_error=False,
+        ):
+            if ok:
+                success += 1
+            else:
+                error_count += 1
+        return success, error_count
 
-    def get_count(self) -> int:
-        """Get the number of documents in the index."""
-        self.es.indices.refresh(index=self.index_name)
+    @staticmethod
+    def _load_studies(json_path: Path) -> Iterator[dict]:
+        """
+        Stream studies from a JSON array file, or a JSON Lines file (.jsonl).
+
+        Studies are parsed one at a time, so memory use does not grow with the file and
+        the first bulk request goes out before the whole file is read.
+        """
+        if json_path.suffix == ".jsonl":
+            with open(json_path) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            with open(json_path, "rb") as f:
+                # use_float keeps numbers as floats rather than Decimals, as json.load does
+                yield from ijson.items(f, "item", use_float=True)
+
+    def index_from_file(
+        self, json_path: Path, bulk_options: BulkOptions | None = None
+    ) -> tuple[int, int]:
+        """Stream studies from a JSON or JSON Lines file and index them."""
+        return self.index_entries(self._load_studies(json_path), bulk_options)
+
+    def index_from_directory(
+        self, output_dir: Path, bulk_options: BulkOptions | None = None
+    ) -> tuple[int, int]:
+        """Index all JSON and JSON Lines files in output directory."""
+        # One stream across all files, so bulk chunks are not cut short at the end of
+        # each file and the threads stay busy between files
+        studies = (
+            study
+            for json_file in sorted(output_dir.glob("*.json*"))
+            if json_file.suffix in (".json", ".jsonl")
+            for study in self._load_studies(json_file)
+        )
+        return self.index_entries(studies, bulk_options)
+
+    def multi_search(
+        self, search_bodies: list[dict], batch_size: int = 50
+    ) -> list[dict]:
+        """
+        Run many searches against the index through msearch, batch_size searches at a time.
+
+        Search bodies can be built with organism_search_body/imaging_method_search_body.
+
+        Use this for independent searches (e.g. one per dashboard panel, or example entries
+        for each facet value) rather than one search call each: it amortises the HTTP
+        round trips, while the batch size keeps the concurrent searches well below the
+        node's search queue limit. Responses are returned in the same order as
+        search_bodies.
+        """
+        responses = []
+        for start in range(0, len(search_bodies), batch_size):
+            searches = []
+            for body in search_bodies[start : start + batch_size]:
+                searches += [{}, body]
+            response = self.es.msearch(index=self.index_name, body=searches)
+            responses += response["responses"]
+        return responses
+
+    def get_count(self, refresh: bool = False) -> int:
+        """
+        Get the number of documents in the index.
+
+        Documents indexed since the last refresh are not counted unless refresh is set;
+        forcing a refresh writes a new segment, so avoid it while indexing.
+        """
+        if refresh:
+            self.es.indices.refresh(index=self.index_name)
         result = self.es.count(index=self.index_name)
         return result["count"]
 
@@ -368,17 +634,66 @@ class DatabaseEntryIndexer:
         query: str,
         size: int = 10,
         from_: int = 0,
+        source_includes: list[str] | None = None,
+        short_description: bool = False,
     ):
         """Simple full-text search across studies."""
         body = {
             "query": self._build_text_query(query),
             "size": size,
             "from": from_,
+            "_source": self._source_filter(source_includes, short_description),
             "highlight": {"fields": {"*": {}}},
         }
 
         return self.es.search(index=self.index_name, body=body)
 
+    def iter_search(
+        self,
+        query: str = "",
+        page_size: int = 500,
+        keep_alive: str = "1m",
+        source_includes: list[str] | None = None,
+        short_description: bool = False,
+    ) -> Iterator[dict]:
+        """
+        Yield every hit for a query, paging with a point in time and search_after.
+
+        Unlike from/size, each page costs the same however deep it is, and the point in
+        time keeps the pages consistent if the index is refreshed part way through.
+        """
+        pit_id = self.es.open_point_in_time(
+            index=self.index_name, keep_alive=keep_alive
+        )["id"]
+        try:
+            search_after = None
+            while True:
+                body = {
+                    "query": (
+                        self._build_text_query(query) if query else {"match_all": {}}
+                    ),
+                    "size": page_size,
+                    "pit": {"id": pit_id, "keep_alive": keep_alive},
+                    # _shard_doc breaks ties between equal scores for search_after
+                    "sort": [{"_score": "desc"}, {"_shard_doc": "asc"}],
+                    "track_total_hits": False,
+                    "_source": self._source_filter(source_includes, short_description),
+                }
+                if search_after:
+                    body["search_after"] = search_after
+
+                response = self.es.search(body=body)
+                hits = response["hits"]["hits"]
+                yield from hits
+
+                if len(hits) < page_size:
+                    break
+                search_after = hits[-1]["sort"]
+                # Each response may carry a new id for the same point in time
+                pit_id = response.get("pit_id", pit_id)
+        finally:
+            self.es.close_point_in_time(id=pit_id)
+
     def faceted_search(
         self,
         query: str = "",
@@ -391,8 +706,146 @@ class DatabaseEntryIndexer:
         require_thumbnail: bool = False,
         size: int = 10,
         from_: int = 0,
+        source_includes: list[str] | None = None,
+        short_description: bool = False,
     ) -> dict:
         """Search with filters and return facet aggregations."""
+        searches = self._build_faceted_search_requests(
+            query=query,
+            publishers=publishers,
+            organisms=organisms,
+            imaging_methods=imaging_methods,
+            licenses=licenses,
+            date_from=date_from,
+            date_to=date_to,
+            require_thumbnail=require_thumbnail,
+            size=size,
+            from_=from_,
+            source_includes=source_includes,
+            short_description=short_description,
+        )
+        response = self.es.msearch(index=self.index_name, body=searches)
+        return self._combine_faceted_search_responses(response)
+
+    async def faceted_search_async(
+        self,
+        query: str = "",
+        publishers: list[str] | None = None,
+        organisms: list[str] | None = None,
+        imaging_methods: list[str] | None = None,
+        licenses: list[str] | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        require_thumbnail: bool = False,
+        size: int = 10,
+        from_: int = 0,
+        source_includes: list[str] | None = None,
+        short_description: bool = False,
+    ) -> dict:
+        """Async variant of faceted_search, for use from the API event loop."""
+        searches = self._build_faceted_search_requests(
+            query=query,
+            publishers=publishers,
+            organisms=organisms,
+            imaging_methods=imaging_methods,
+            licenses=licenses,
+            date_from=date_from,
+            date_to=date_to,
+            require_thumbnail=require_thumbnail,
+            size=size,
+            from_=from_,
+            source_includes=source_includes,
+            short_description=short_description,
+        )
+        response = await self.async_es.msearch(index=self.index_name, body=searches)
+        return self._combine_faceted_search_responses(response)
+
+    @staticmethod
+    def _organism_filter(organisms: list[str]) -> dict:
+        """Filter on the pre-computed taxon_ids."""
+        return {"terms": {"taxon_ids.id": organisms}}
+
+    @staticmethod
+    def _imaging_method_filter(imaging_methods: list[str]) -> dict:
+        """Filter on the pre-computed imaging_method_ids."""
+        return {"terms": {"imaging_method_ids.id": imaging_methods}}
+
+    @staticmethod
+    def _source_filter(
+        source_includes: list[str] | None = None, short_description: bool = False
+    ) -> dict:
+        """
+        Select the _source fields returned per hit.
+
+        Listings only need a few fields of each entry, and the full documents dominate
+        the response size. The index-only fields are not returned, except for
+        description_short, which replaces the full description when short_description
+        is set.
+        """
+        if short_description:
+            excludes = [
+                field for field in INDEX_ONLY_FIELDS if field != "description_short"
+            ]
+            excludes.append("description")
+        else:
+            excludes = list(INDEX_ONLY_FIELDS)
+        source_filter: dict = {"excludes": excludes}
+        if source_includes:
+            if short_description and "description" in source_includes:
+                source_includes = [*source_includes, "description_short"]
+            source_filter["includes"] = source_includes
+        return source_filter
+
+    def organism_search_body(
+        self,
+        organisms: list[str],
+        size: int = 10,
+        source_includes: list[str] | None = None,
+    ) -> dict:
+        """Build a search body for entries of any of the given organism ids."""
+        return {
+            "query": {"bool": {"filter": [self._organism_filter(organisms)]}},
+            "size": size,
+            "_source": self._source_filter(source_includes),
+        }
+
+    def imaging_method_search_body(
+        self,
+        imaging_methods: list[str],
+        size: int = 10,
+        source_includes: list[str] | None = None,
+    ) -> dict:
+        """Build a search body for entries using any of the given imaging method ids."""
+        return {
+            "query": {
+                "bool": {"filter": [self._imaging_method_filter(imaging_methods)]}
+            },
+            "size": size,
+            "_source": self._source_filter(source_includes),
+        }
+
+    def _build_faceted_search_requests(
+        self,
+        query: str = "",
+        publishers: list[str] | None = None,
+        organisms: list[str] | None = None,
+        imaging_methods: list[str] | None = None,
+        licenses: list[str] | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        require_thumbnail: bool = False,
+        size: int = 10,
+        from_: int = 0,
+        source_includes: list[str] | None = None,
+        short_description: bool = False,
+    ) -> list[dict]:
+        """
+        Build the msearch lines for a filtered search with facet aggregations.
+
+        Aggregations and hits are requested separately: with size=0 the aggregation
+        search can be served from the shard request cache, which stays warm while
+        users page through results or toggle filters for the same query.
+        """
         # Build query
         must = []
         filter_clauses = []
@@ -407,27 +860,11 @@ class DatabaseEntryIndexer:
         if query:
             must.append(self._build_text_query(query))
 
-        # Organism filter - filter by pre-computed taxon_ids
         if organisms:
-            filter_clauses.append(
-                {
-                    "nested": {
-                        "path": "taxon_ids",
-                        "query": {"terms": {"taxon_ids.id": organisms}},
-                    }
-                }
-            )
+            filter_clauses.append(self._organism_filter(organisms))
 
-        # Imaging method filter - filter by pre-computed imaging_method_ids
         if imaging_methods:
-            filter_clauses.append(
-                {
-                    "nested": {
-                        "path": "imaging_method_ids",
-                        "query": {"terms": {"imaging_method_ids.id": imaging_methods}},
-                    }
-                }
-            )
+            filter_clauses.append(self._imaging_method_filter(imaging_methods))
 
         # Date range filter
         if date_from or date_to:
@@ -452,53 +889,39 @@ class DatabaseEntryIndexer:
         else:
             main_query = {"match_all": {}}
 
-        body = {
+        aggregations_body = {
             "query": main_query,
-            "size": size,
-            "from": from_,
+            "size": 0,
+            # Aggregations visit every match anyway, so take the exact total from here
+            "track_total_hits": True,
             "aggs": {
+                # Low-cardinality fields use execution_hint "map", which avoids building
+                # global ordinals; organisms are left on the default as they keep growing.
                 "license": {
                     "terms": {
                         "field": "license",
                         "size": 50,
+                        "execution_hint": "map",
                     }
                 },
+                # Flat "<id>|<label>" keys: no nested docs to walk, and no top_hits
+                # sub-aggregation per bucket to find the label. The sizes count id|label
+                # pairs, so an id indexed under several labels takes several buckets.
                 "organisms": {
-                    "nested": {"path": "taxon_ids"},
-                    "aggs": {
-                        "taxon_ids": {
-                            "terms": {"field": "taxon_ids.id", "size": 200},
-                            "aggs": {
-                                "name": {
-                                    "top_hits": {
-                                        "size": 1,
-                                        "_source": ["taxon_ids.name"],
-                                    }
-                                }
-                            },
-                        }
-                    },
+                    "terms": {"field": "taxon_keys", "size": 200},
                 },
                 "imaging_methods": {
-                    "nested": {"path": "imaging_method_ids"},
-                    "aggs": {
-                        "imaging_method_ids": {
-                            "terms": {"field": "imaging_method_ids.id", "size": 70},
-                            "aggs": {
-                                "name": {
-                                    "top_hits": {
-                                        "size": 1,
-                                        "_source": ["imaging_method_ids.name"],
-                                    }
-                                }
-                            },
-                        }
+                    "terms": {
+                        "field": "imaging_method_keys",
+                        "size": 70,
+                        "execution_hint": "map",
                     },
                 },
                 "publishers": {
                     "terms": {
                         "field": "publisher.id",
                         "size": 10,
+                        "execution_hint": "map",
                     },
                 },
                 "year_published": {
@@ -510,7 +933,43 @@ class DatabaseEntryIndexer:
                     },
                 },
             },
+        }
+
+        hits_body = {
+            "query": main_query,
+            "size": size,
+            "from": from_,
+            "track_total_hits": False,
+            "_source": self._source_filter(source_includes, short_description),
             "highlight": {"fields": {"*": {}}},
         }
 
-        return self.es.search(index=self.index_name, body=body)
+        return [
+            {"request_cache": True},
+            aggregations_body,
+            {},
+            hits_body,
+        ]
+
+    @staticmethod
+    def _combine_faceted_search_responses(
+        response: ObjectApiResponse,
+    ) -> ObjectApiResponse:
+        """Merge the aggregation and hits msearch responses into one search response."""
+        for item in response["responses"]:
+            if "error" in item:
+                raise ApiError(
+                    message=str(item["error"].get("reason", item["error"])),
+                    meta=response.meta,
+                    body=item,
+                )
+
+        aggregations_response, hits_response = response["responses"]
+        hits = hits_response["hits"]
+        hits["total"] = aggregations_response["hits"]["total"]
+        combined = {
+            "took": response["took"],
+            "hits": hits,
+            "aggregations": aggregations_response["aggregations"],
+        }
+        return ObjectApiResponse(body=combined, meta=response.meta)
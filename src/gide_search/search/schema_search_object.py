@@ -1,6 +1,8 @@
+import functools
 import logging
 
-from typing import Protocol
+from collections.abc import Iterable
+from typing import Any, Protocol, TypeVar
 from urllib import parse
 
 from pydantic import (
@@ -22,10 +24,80 @@ PREFIXES_TO_EXPAND = {
 }
 
 
+# Fields only present in the index document to support facetting and result listings; they are not part of a Dataset.
+INDEX_ONLY_FIELDS = (
+    "taxon_ids",
+    "imaging_method_ids",
+    "taxon_keys",
+    "imaging_method_keys",
+    "description_short",
+)
+
+
+# The id normalisers below are pure and see the same few taxa and imaging methods across
+# most datasets, so results are cached rather than recomputed for every node.
+@functools.lru_cache(maxsize=4096)
+def _strip_taxon_iri_leading_zeroes(value: str) -> str:
+    if value.startswith("http://purl.obolibrary.org/obo/NCBITaxon_0"):
+        digits = str(value).split("_")[1]
+        normalised_digits = int(digits)
+
+        return f"http://purl.obolibrary.org/obo/NCBITaxon_{normalised_digits}"
+    else:
+        return value
+
+
+@functools.lru_cache(maxsize=4096)
+def _fix_fbbi_iri(value: str) -> str:
+    # FBbi ids require that specific capitalization, which is easy to get incorrect.
+    if value.lower().startswith("http://purl.obolibrary.org/obo/fbbi_"):
+        digits = str(value).split("_")[1].zfill(8)[-8:]
+        return f"http://purl.obolibrary.org/obo/FBbi_{digits}"
+    else:
+        return value
+
+
 class TermLabelProvider(Protocol):
     def fetch_label_by_iri(self, term_iri: str) -> str | None: ...
 
 
+NodeT = TypeVar("NodeT", bound="JsonLdNode")
+
+
+def unique_by_id(nodes: Iterable[NodeT]) -> list[NodeT]:
+    """Drop nodes whose id has already been seen, keeping the first occurrence."""
+    unique: dict[str, NodeT] = {}
+    for node in nodes:
+        unique.setdefault(node.id, node)
+    return list(unique.values())
+
+
+def validate_by_type(
+    value, models_by_type: tuple[tuple[str, type[BaseModel]], ...]
+) -> Any:
+    """
+    Validate each node of a list with the model for the first of its types that matches.
+
+    Nodes with none of the given types, and values that are not lists, are left as they
+    are for the field's own validation.
+    """
+    if not isinstance(value, list):
+        return value
+    out = []
+    for item in value:
+        if isinstance(item, dict):
+            types = item.get("@type") or item.get("type") or ()
+            # A single type may be given as a bare string
+            if isinstance(types, str):
+                types = (types,)
+            for type_name, model in models_by_type:
+                if type_name in types:
+                    item = model.model_validate(item)
+                    break
+        out.append(item)
+    return out
+
+
 class JsonLdNode(BaseModel):
     model_config = ConfigDict(
         populate_by_name=True,  # accept `id` AND `@id`
@@ -41,11 +113,9 @@ class JsonLdNode(BaseModel):
         if not isinstance(value, str):
             raise TypeError
 
-        split_id = value.split(":", 1)
-        if len(split_id) > 1:
-            for prefix, full_url in PREFIXES_TO_EXPAND.items():
-                if split_id[0] == prefix:
-                    return f"{full_url}{split_id[1]}"
+        prefix, sep, local_id = value.partition(":")
+        if sep and (full_url := PREFIXES_TO_EXPAND.get(prefix)):
+            return f"{full_url}{local_id}"
         return value
 
 
@@ -67,10 +137,8 @@ class Publisher(Organization):
     @field_validator("id", mode="after")
     @classmethod
     def standarise_id_url(cls, value: str):
-        try:
-            x = parse.urlsplit(value)
-        except Exception as e:
-            raise e
+        # Raises ValueError for malformed URLs
+        parse.urlsplit(value)
 
         if not value.endswith("/"):
             return f"{value}/"
@@ -110,13 +178,7 @@ class Taxon(JsonLdNode):
     @field_validator("id", mode="after")
     @classmethod
     def strip_leading_zeroes(cls, value: str) -> str:
-        if value.startswith("http://purl.obolibrary.org/obo/NCBITaxon_0"):
-            digits = str(value).split("_")[1]
-            normalised_digits = int(digits)
-
-            return f"http://purl.obolibrary.org/obo/NCBITaxon_{normalised_digits}"
-        else:
-            return value
+        return _strip_taxon_iri_leading_zeroes(value)
 
 
 class DefinedTerm(JsonLdNode):
@@ -125,12 +187,7 @@ class DefinedTerm(JsonLdNode):
     @field_validator("id", mode="after")
     @classmethod
     def fix_common_iri_errors(cls, value: str) -> str:
-        # FBbi ids require that specific capitalization, which is easy to get incorrect.
-        if value.lower().startswith("http://purl.obolibrary.org/obo/fbbi_"):
-            digits = str(value).split("_")[1].zfill(8)[-8:]
-            return f"http://purl.obolibrary.org/obo/FBbi_{digits}"
-        else:
-            return value
+        return _fix_fbbi_iri(value)
 
 
 class BioSample(JsonLdNode):
@@ -169,54 +226,23 @@ class Dataset(JsonLdNode):
     @field_validator("about", mode="before")
     @classmethod
     def discriminate_about(cls, value, info: ValidationInfo):
-        if not isinstance(value, list):
-            return value
-        out = []
-        for item in value:
-            if isinstance(item, dict):
-                types = item.get("@type") or item.get("type") or []
-                if isinstance(types, str):
-                    types = [types]
-                if "BioSample" in types:
-                    out.append(BioSample.model_validate(item))
-                elif "Taxon" in types:
-                    out.append(Taxon.model_validate(item))
-                elif "DefinedTerm" in types:
-                    out.append(DefinedTerm.model_validate(item))
-                else:
-                    out.append(item)
-            else:
-                out.append(item)
-        return out
+        return validate_by_type(
+            value,
+            (("BioSample", BioSample), ("Taxon", Taxon), ("DefinedTerm", DefinedTerm)),
+        )
 
     @field_validator("measurementMethod", mode="before")
     @classmethod
     def discriminate_measurement_method(cls, value, info: ValidationInfo):
-        if not isinstance(value, list):
-            return value
-        out = []
-        for item in value:
-            if isinstance(item, dict):
-                types = item.get("@type") or item.get("type") or []
-                if isinstance(types, str):
-                    types = [types]
-                if "LabProtocol" in types:
-                    out.append(LabProtocol.model_validate(item))
-                elif "DefinedTerm" in types:
-                    out.append(DefinedTerm.model_validate(item))
-                else:
-                    out.append(item)
-            else:
-                out.append(item)
-        return out
+        return validate_by_type(
+            value, (("LabProtocol", LabProtocol), ("DefinedTerm", DefinedTerm))
+        )
 
     @model_validator(mode="before")
     @classmethod
     def remove_indexing_fields(self, data):
-        index_fields = ["taxon_ids", "imaging_method_ids"]
-
         if isinstance(data, dict):
-            for field in index_fields:
+            for field in INDEX_ONLY_FIELDS:
                 data.pop(field, None)
         return data
 
@@ -228,17 +254,25 @@ class IndexableDataset(Dataset):
     @model_validator(mode="after")
     def populate_additional_index_fields(self) -> Self:
         """
-        Populate the fields that get used for facetting
+        Populate the fields that get used for facetting.
+
+        Each id is only kept once. Terms aggregations count a document once per key, so
+        repeats would not skew the facets, but they would make fetch_labels look the
+        same term up again, and be copied into the taxon_keys/imaging_method_keys
+        derived from these fields at index time.
         """
-        for biological_object in self.about:
-            if isinstance(biological_object, Taxon):
-                self.taxon_ids.append(biological_object)
-
-        for measurment_object in self.measurementMethod:
-            if isinstance(measurment_object, DefinedTerm) and (
-                measurment_object.id.startswith("http://purl.obolibrary.org/obo/FBbi_")
-            ):
-                self.imaging_method_ids.append(measurment_object)
+        self.taxon_ids = unique_by_id(
+            biological_object
+            for biological_object in self.about
+            if isinstance(biological_object, Taxon)
+        )
+
+        self.imaging_method_ids = unique_by_id(
+            measurment_object
+            for measurment_object in self.measurementMethod
+            if isinstance(measurment_object, DefinedTerm)
+            and measurment_object.id.startswith("http://purl.obolibrary.org/obo/FBbi_")
+        )
         return self
 
     def fetch_labels(self, label_provider: TermLabelProvider) -> None:
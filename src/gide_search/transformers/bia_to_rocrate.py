@@ -1,11 +1,31 @@
+import functools
 import re
 
 from pydantic import AnyUrl, ValidationError
 from pyld import jsonld
 
+from gide_search.transformers.frame_transformer import static_context_document_loader
 from gide_search.transformers.to_rocrate import ROCrateTransformer
 from gide_search.utils.ontology_term_finder import OntologyTermFinder
 
+# Trailing digits of an NCBI taxon id given in a non-IRI form, e.g. "NCBI:txid10090"
+NCBI_ID_DIGITS_PATTERN = re.compile(r"(\d+)$")
+
+
+@functools.lru_cache(maxsize=512)
+def ncbi_taxon_iri(ncbi_id: str) -> str | None:
+    """
+    Expand an NCBI taxon id to its OBO IRI, or None if it has no numeric id.
+
+    Cached as the same few organisms recur across most studies.
+    """
+    if ncbi_id.startswith("http"):
+        return ncbi_id
+    match = NCBI_ID_DIGITS_PATTERN.search(ncbi_id)
+    if match:
+        return f"http://purl.obolibrary.org/obo/NCBITaxon_{int(match.group(1))}"
+    return None
+
 
 class BIAROCrateTransformer(ROCrateTransformer):
     generated_ids: set[str]
@@ -29,12 +49,12 @@ class BIAROCrateTransformer(ROCrateTransformer):
         super().__init__()
 
     def type_rank(self, d):
-        return min(self.TYPE_ORDER.get(t, float("inf")) for t in d.get("@type", []))
+        return min(self.TYPE_ORDER.get(t, float("inf")) for t in d.get("@type", ()))
 
     def _get_root_dataset(self, bia_search_hit: dict):
 
         accession_id = bia_search_hit["accession_id"]
-        return {
+        root_dataset = {
             "@id": f"https://www.ebi.ac.uk/biostudies/bioimages/studies/{accession_id}",
             "@type": ["Dataset"],
             "identifier": accession_id,
@@ -47,20 +67,25 @@ class BIAROCrateTransformer(ROCrateTransformer):
             "author": self._get_authors(bia_search_hit["author"]),
             "funder": self._get_funder(bia_search_hit["grant"]),
             "citation": self._get_citation(bia_search_hit["related_publication"]),
-            "about": self._get_bio_samples(bia_search_hit),
-            "measurementMethod": self._get_imaging_protocols(bia_search_hit),
-            "size": self._get_size(bia_search_hit),
-            "thumbnailUrl": self._get_image(bia_search_hit),
         }
+        (
+            root_dataset["about"],
+            root_dataset["measurementMethod"],
+            root_dataset["size"],
+            root_dataset["thumbnailUrl"],
+        ) = self._get_dataset_properties(bia_search_hit)
+        return root_dataset
 
     def _get_funder(self, bia_grants: list[dict]):
         funders = []
         for bia_grant in bia_grants:
-            if bia_grant.get("id") and len(bia_grant.get("funder", ())) > 1:
+            grant_id = bia_grant.get("id")
+            grant_funders = bia_grant.get("funder", ())
+            if grant_id and len(grant_funders) > 1:
                 try:
-                    grant_id_url = str(AnyUrl(bia_grant["id"]))
+                    grant_id_url = str(AnyUrl(grant_id))
                 except ValidationError:
-                    grant_id_url = self._generate_ref_id(bia_grant["id"])
+                    grant_id_url = self._generate_ref_id(grant_id)
 
                 # Use funder name:
 
@@ -68,35 +93,45 @@ class BIAROCrateTransformer(ROCrateTransformer):
                     {
                         "@id": grant_id_url,
                         "@type": ["Grant"],
-                        "name": bia_grant.get("funder", [{}])[0].get("display_name"),
+                        "name": grant_funders[0].get("display_name"),
                         # TODO: use name from grant funder?
-                        "identifier": bia_grant["id"],
+                        "identifier": grant_id,
                     }
                 )
         return funders
 
     def _get_citation(self, bia_publications: list[dict]):
-        publications = []
-        for bia_publication in bia_publications:
-            publications.append(
-                {
-                    "@id": bia_publication["doi"]
-                    or bia_publication["pubmed_id"]
-                    or self._generate_ref_id(bia_publication["title"]),
-                    "@type": ["ScholarlyArticle"],
-                    "name": bia_publication["title"],
-                    "datePublished": str(bia_publication["publication_year"]),
-                }
-            )
-        return publications
-
-    def _get_bio_samples(self, bia_search_hit: dict):
+        return [
+            {
+                "@id": bia_publication["doi"]
+                or bia_publication["pubmed_id"]
+                or self._generate_ref_id(bia_publication["title"]),
+                "@type": ["ScholarlyArticle"],
+                "name": bia_publication["title"],
+                "datePublished": str(bia_publication["publication_year"]),
+            }
+            for bia_publication in bia_publications
+        ]
+
+    def _get_dataset_properties(self, bia_search_hit: dict):
+        """
+        Collect the about, measurementMethod, size and thumbnailUrl properties.
+
+        These are all built from the study's datasets, so are collected in a single pass.
+        """
         bio_samples = []
-        taxons_ids = set()
+        imaging_protocol = []
+        # Insertion-ordered unique ids, so the references come out in a stable order
+        taxons_ids: dict[str, None] = {}
+        imaging_method_ids: dict[str, None] = {}
+        file_count = 0
+        bytes_size = 0
+        image_links = []
+
         for dataset in bia_search_hit["dataset"]:
             for bia_bio_sample in dataset["biological_entity"]:
                 taxons = self._get_taxons_from_ontology(bia_bio_sample)
-                [taxons_ids.add(taxon["@id"]) for taxon in taxons]
+                taxons_ids.update((taxon["@id"], None) for taxon in taxons)
 
                 bio_samples.append(
                     {
@@ -108,22 +143,51 @@ class BIAROCrateTransformer(ROCrateTransformer):
                     }
                 )
 
+            for bia_image_acquisition_protocol in dataset["acquisition_process"]:
+                imaging_methods = self._get_imaging_method_from_ontology(
+                    bia_image_acquisition_protocol
+                )
+                imaging_method_ids.update(
+                    (imaging_method["@id"], None) for imaging_method in imaging_methods
+                )
+
+                imaging_protocol.append(
+                    {
+                        "@id": f"#{bia_image_acquisition_protocol["uuid"]}",
+                        "@type": ["LabProtocol"],
+                        "name": bia_image_acquisition_protocol["title"],
+                        "description": bia_image_acquisition_protocol[
+                            "protocol_description"
+                        ],
+                        "labEquipment": bia_image_acquisition_protocol[
+                            "imaging_instrument_description"
+                        ],
+                        "measurementTechnique": imaging_methods,
+                    }
+                )
+
+            file_count += dataset["file_reference_count"]
+            bytes_size += dataset["file_reference_size_bytes"]
+            image_links.append(dataset["example_image_uri"])
+
         bio_samples += [{"@id": taxon_id} for taxon_id in taxons_ids]
+        imaging_protocol += [{"@id": imaging_id} for imaging_id in imaging_method_ids]
 
-        return bio_samples
+        return (
+            bio_samples,
+            imaging_protocol,
+            self._get_size(file_count, bytes_size),
+            image_links,
+        )
 
     def _get_taxons_from_ontology(self, bia_bio_sample):
         taxons = []
         for bia_taxon in bia_bio_sample["organism_classification"]:
             if bia_taxon["ncbi_id"]:
                 # Fetch labels from ontology to make sure we use canonical values.
-                ncbi_id: str = bia_taxon["ncbi_id"]
-                if not ncbi_id.startswith("http"):
-                    match = re.search(r"(\d+)$", ncbi_id)
-                    if match:
-                        ncbi_id = f"http://purl.obolibrary.org/obo/NCBITaxon_{int(match.group(1))}"
-                    else:
-                        continue
+                ncbi_id = ncbi_taxon_iri(bia_taxon["ncbi_id"])
+                if ncbi_id is None:
+                    continue
 
                 term_with_labels = self.ontology_term_finder.fetch_term_from_ontology(
                     "ncbitaxon", ncbi_id
@@ -163,36 +227,6 @@ class BIAROCrateTransformer(ROCrateTransformer):
                     )
         return taxons
 
-    def _get_imaging_protocols(self, bia_search_hit: dict):
-        imaging_protocol = []
-        imaging_method_ids = set()
-        for dataset in bia_search_hit["dataset"]:
-            for bia_image_acquisition_protocol in dataset["acquisition_process"]:
-                imaging_methods = self._get_imaging_method_from_ontology(
-                    bia_image_acquisition_protocol
-                )
-                [
-                    imaging_method_ids.add(imaging_method["@id"])
-                    for imaging_method in imaging_methods
-                ]
-
-                imaging_protocol.append(
-                    {
-                        "@id": f"#{bia_image_acquisition_protocol["uuid"]}",
-                        "@type": ["LabProtocol"],
-                        "name": bia_image_acquisition_protocol["title"],
-                        "description": bia_image_acquisition_protocol[
-                            "protocol_description"
-                        ],
-                        "labEquipment": bia_image_acquisition_protocol[
-                            "imaging_instrument_description"
-                        ],
-                        "measurementTechnique": imaging_methods,
-                    }
-                )
-        imaging_protocol += [{"@id": imaging_id} for imaging_id in imaging_method_ids]
-        return imaging_protocol
-
     def _get_imaging_method_from_ontology(self, bia_image_acquisition_protocol):
         imaging_methods = []
 
@@ -230,13 +264,7 @@ class BIAROCrateTransformer(ROCrateTransformer):
                     )
         return imaging_methods
 
-    def _get_size(self, bia_search_hit: dict):
-        file_count = 0
-        bytes_size = 0
-        for dataset in bia_search_hit["dataset"]:
-            file_count += dataset["file_reference_count"]
-            bytes_size += dataset["file_reference_size_bytes"]
-
+    def _get_size(self, file_count: int, bytes_size: int):
         return [
             {
                 "@id": self._generate_ref_id("#total-file-size"),
@@ -254,12 +282,6 @@ class BIAROCrateTransformer(ROCrateTransformer):
             },
         ]
 
-    def _get_image(self, bia_search_hit: dict):
-        image_links = []
-        for dataset in bia_search_hit["dataset"]:
-            image_links.append(dataset["example_image_uri"])
-        return image_links
-
     def _get_publisher(self):
         return {
             "@id": "https://www.ebi.ac.uk/bioimage-archive/",
@@ -302,19 +324,17 @@ class BIAROCrateTransformer(ROCrateTransformer):
             return orcid_id
 
     def _get_affiliation(self, bia_affiliation_list: list[dict]):
-        affiliations = []
-        for bia_affiliation in bia_affiliation_list:
-            affiliations.append(
-                {
-                    "@id": bia_affiliation["rorid"]
-                    or self._generate_ref_id(bia_affiliation["display_name"]),
-                    "@type": ["Organization"],
-                    "name": bia_affiliation["display_name"],
-                    "address": bia_affiliation["address"],
-                    "url": bia_affiliation["website"],
-                }
-            )
-        return affiliations
+        return [
+            {
+                "@id": bia_affiliation["rorid"]
+                or self._generate_ref_id(bia_affiliation["display_name"]),
+                "@type": ["Organization"],
+                "name": bia_affiliation["display_name"],
+                "address": bia_affiliation["address"],
+                "url": bia_affiliation["website"],
+            }
+            for bia_affiliation in bia_affiliation_list
+        ]
 
     def transform(self, single_object: dict) -> dict:
         accession_id = single_object["accession_id"]
@@ -328,7 +348,9 @@ class BIAROCrateTransformer(ROCrateTransformer):
         }
 
         flattened = jsonld.flatten(
-            ro_crate_metadata, ctx=self._get_ro_crate_context_with_containers()
+            ro_crate_metadata,
+            ctx=self._get_ro_crate_context_with_containers(),
+            options={"documentLoader": static_context_document_loader},
         )
 
         flattened["@context"] = self._get_ro_crate_context()
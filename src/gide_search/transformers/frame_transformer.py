@@ -1,6 +1,21 @@
+from pyld import jsonld
+
 from gide_search.transformers.base_transformer import Transformer
 
 
+def static_context_document_loader(url: str, options: dict | None = None) -> dict:
+    """
+    Load a remote document with pyld's default loader, tagged as static.
+
+    pyld only keeps remote contexts in its shared cache between calls when the loaded
+    document has a tag. Without one, the ro-crate context is fetched again for every
+    crate that is framed or flattened.
+    """
+    remote_doc = jsonld.get_document_loader()(url, options)
+    remote_doc.setdefault("tag", "static")
+    return remote_doc
+
+
 class FrameTransformer(Transformer):
 
     def _get_ro_crate_context(self) -> str | dict | list[dict | str]:
@@ -4,7 +4,10 @@ from pydantic import ValidationError
 from pyld import jsonld
 
 from gide_search.search.schema_search_object import IndexableDataset
-from gide_search.transformers.frame_transformer import FrameTransformer
+from gide_search.transformers.frame_transformer import (
+    FrameTransformer,
+    static_context_document_loader,
+)
 from gide_search.utils.ontology_term_finder import OntologyTermFinder
 
 logger = logging.getLogger("__main__." + __name__)
@@ -25,19 +28,27 @@ class ROCrateIndexTransformer(FrameTransformer):
         self.ontology_lookup = OntologyTermFinder()
         super().__init__()
 
-    def transform(self, single_object: dict):
+    def validate(self, single_object: dict) -> IndexableDataset:
+        """
+        Frame an ro-crate and validate it as an IndexableDataset.
 
+        Ontology labels are not fetched, so this is enough to check that an ro-crate
+        can be indexed without paying for the label lookups and the dump.
+        """
         base_iri = self._find_root_object(single_object).get("about", {}).get("@id")
 
         # FIXME: currently replacing context with defined one while we all update our ro-crates. The base IRI still needs to be present.
-        single_object["@context"] = [
-            "https://www.gide-project.org/ro-crate/search/1.0/context",
-            {"@base": base_iri},
-        ]
+        single_object = single_object | {
+            "@context": [
+                "https://www.gide-project.org/ro-crate/search/1.0/context",
+                {"@base": base_iri},
+            ]
+        }
 
         framed_doc = jsonld.frame(
             single_object,
             self.frame,
+            options={"documentLoader": static_context_document_loader},
         )
 
         if not isinstance(framed_doc, dict):
@@ -46,27 +57,35 @@ class ROCrateIndexTransformer(FrameTransformer):
         framed_doc.pop("@context")
 
         try:
-            dataset = IndexableDataset.model_validate(framed_doc)
-            dataset.fetch_labels(self.ontology_lookup)
+            return IndexableDataset.model_validate(framed_doc)
         except ValidationError as e:
             logger.error(
                 f"Validation failed for: {framed_doc.get('@id', 'Unknown object')}"
             )
             raise e
 
+    def transform(self, single_object: dict):
+        dataset = self.validate(single_object)
+        dataset.fetch_labels(self.ontology_lookup)
         return dataset.model_dump(by_alias=False)
 
     @staticmethod
     def _find_root_object(ro_crate_metadata: dict) -> dict:
+        fallback = None
         for entity in ro_crate_metadata.get("@graph"):
             if entity.get("@id") == "ro-crate-metadata.json":
                 return entity
 
-        # Waiting on update to example ro-crate to correct mistake we made about the ID of the root object.
-        for entity in ro_crate_metadata.get("@graph"):
-            if entity.get("@type") == "CreativeWork" and all(
-                (x in entity for x in ("about", "conformsTo"))
+            # Waiting on update to example ro-crate to correct mistake we made about the ID of the root object.
+            if (
+                fallback is None
+                and entity.get("@type") == "CreativeWork"
+                and "about" in entity
+                and "conformsTo" in entity
             ):
-                return entity
+                fallback = entity
+
+        if fallback is not None:
+            return fallback
 
         raise ValueError("Cannot find root entity in ro-crate document")
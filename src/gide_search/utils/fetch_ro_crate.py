@@ -1,9 +1,14 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Callable
 
 import requests
 
+# Number of ro-crate files downloaded concurrently from each source
+DOWNLOAD_WORKERS = 8
+
 
 class ROCrateFetcher:
     IDR_GITHUB_INFO = {
@@ -71,23 +76,44 @@ class ROCrateFetcher:
             gitub_folder_urls = [gitub_folder_urls]
 
         ro_crate_files = []
-        for url in gitub_folder_urls:
-            os.makedirs(target_directory, exist_ok=True)
-            files = requests.get(url).json()
+        with requests.Session() as session:
+            for url in gitub_folder_urls:
+                os.makedirs(target_directory, exist_ok=True)
+                files = session.get(url).json()
 
-            [
-                ro_crate_files.append(file)
-                for file in files
-                if file["type"] == "file"
-                and file["name"].endswith("ro-crate-metadata.json")
-            ]
+                [
+                    ro_crate_files.append(file)
+                    for file in files
+                    if file["type"] == "file"
+                    and file["name"].endswith("ro-crate-metadata.json")
+                ]
 
         total = len(ro_crate_files)
 
-        for index, file in enumerate(ro_crate_files, start=1):
-            file_data = requests.get(file["download_url"]).content
+        # requests.Session isn't documented as thread-safe, so each download thread
+        # opens its own, keeping its connection to GitHub open across its downloads
+        thread_sessions = threading.local()
+        sessions: list[requests.Session] = []
+
+        def open_session() -> None:
+            thread_sessions.session = requests.Session()
+            sessions.append(thread_sessions.session)
+
+        def download(file: dict) -> None:
+            file_data = thread_sessions.session.get(file["download_url"]).content
             with open(target_directory / file["name"], "wb") as f:
                 f.write(file_data)
 
-            if progress_callback:
-                progress_callback(index, total)
+        # Downloads are small and latency bound, so a few run at once
+        try:
+            with ThreadPoolExecutor(
+                max_workers=DOWNLOAD_WORKERS, initializer=open_session
+            ) as executor:
+                for index, _ in enumerate(
+                    executor.map(download, ro_crate_files), start=1
+                ):
+                    if progress_callback:
+                        progress_callback(index, total)
+        finally:
+            for session in sessions:
+                session.close()
@@ -1,8 +1,8 @@
-import json
 import logging
 from dataclasses import dataclass
 from functools import cache
 
+import orjson
 from ols_client import EBIClient
 from requests.exceptions import HTTPError
 
@@ -19,16 +19,17 @@ class OntologyTerm:
 
 class OntologyTermFinder:
     ebi_client: EBIClient
-    avaliable_ontology_ids: list[str]
+    avaliable_ontology_ids: set[str]
 
     def __init__(
         self,
     ) -> None:
         self.ebi_client = EBIClient()
         ontologies = self.ebi_client.get_ontologies()
-        self.avaliable_ontology_ids = []
-        for ontology in ontologies:
-            self.avaliable_ontology_ids.append(ontology["ontologyId"])
+        # Checked on every lookup, and OLS has a few hundred ontologies
+        self.avaliable_ontology_ids = {
+            ontology["ontologyId"] for ontology in ontologies
+        }
 
     @staticmethod
     def _simplify_search_term(search_terms: str):
@@ -98,13 +99,11 @@ class OntologyTermFinder:
             term_iri = term_iri.removeprefix("obo:")
 
         if term_iri.startswith("http://purl.obolibrary.org/obo/"):
-            local_part = term_iri.rsplit("/", 1)[-1]
-            prefix = local_part.split("_", 1)[0].lower()
+            local_part = term_iri.rpartition("/")[2]
+            prefix = local_part.partition("_")[0].lower()
             return prefix
 
-        if term_iri.startswith("http://www.bioassayontology.org/bao#"):
-            return "bao"
-        if term_iri.startswith("bao:"):
+        if term_iri.startswith(("http://www.bioassayontology.org/bao#", "bao:")):
             return "bao"
 
         return None
@@ -167,6 +166,6 @@ class OntologyTermFinder:
             },
         )
 
-        parsed_response = json.loads(response.content)
+        parsed_response = orjson.loads(response.content)
 
         return parsed_response
@@ -3,15 +3,21 @@
 import pytest
 from fastapi.testclient import TestClient
 
-from gide_search.search.api import app
+from gide_search.search.api import (
+    MAX_ENTRIES_PER_REQUEST,
+    app,
+    listing_entry,
+    parse_combined_aggregate,
+)
+from gide_search.search.schema_search_object import INDEX_ONLY_FIELDS
 
 
 def test_search_api(indexed_data):
     """Test the /search API endpoint with indexed data."""
-    client = TestClient(app)
-
-    # Search for "confocal" which should match the sample document
-    response = client.get("/search?q=confocal&size=10")
+    # Use the client as a context manager so the app lifespan (and its event loop) is shared
+    with TestClient(app) as client:
+        # Search for "confocal" which should match the sample document
+        response = client.get("/search?q=confocal&size=10")
 
     assert response.status_code == 200
 
@@ -34,3 +40,100 @@ def test_search_api(indexed_data):
     entry = hit["entry"]
     assert "name" in entry
     assert "description" in entry
+
+    # The facets are split back into id and label
+    assert {
+        "key": "http://purl.obolibrary.org/obo/NCBITaxon_10090",
+        "count": 1,
+        "label": "Mus musculus",
+    } in data["facets"]["organism"]
+    assert {
+        "key": "http://purl.obolibrary.org/obo/FBbi_00000251",
+        "count": 1,
+        "label": "confocal microscopy",
+    } in data["facets"]["imaging_method"]
+
+
+EXAMPLE_ENTRY_ID = "https://example-database.org/studies/EXAMPLE-001"
+
+
+def test_get_entry_api(indexed_data):
+    """Test that /api/entry returns the entry without the index-only fields."""
+    with TestClient(app) as client:
+        response = client.get(f"/api/entry/{EXAMPLE_ENTRY_ID}")
+
+    assert response.status_code == 200
+
+    entry = response.json()
+    assert entry["id"] == EXAMPLE_ENTRY_ID
+    for field in INDEX_ONLY_FIELDS:
+        assert field not in entry
+
+
+def test_get_entries_api(indexed_data):
+    """Test that /api/entries returns known entries, in the same shape as /api/entry."""
+    with TestClient(app) as client:
+        response = client.get(
+            "/api/entries", params={"ids": [EXAMPLE_ENTRY_ID, "not-an-entry"]}
+        )
+        single_entry = client.get(f"/api/entry/{EXAMPLE_ENTRY_ID}").json()
+
+    assert response.status_code == 200
+
+    # The unknown id is skipped
+    entries = response.json()
+    assert entries == [single_entry]
+
+
+def test_get_entries_api_limits_ids():
+    """Test that /api/entries rejects requests for too many entries."""
+    ids = [f"entry-{i}" for i in range(MAX_ENTRIES_PER_REQUEST + 1)]
+    with TestClient(app) as client:
+        response = client.get("/api/entries", params={"ids": ids})
+
+    assert response.status_code == 422
+
+
+def test_search_api_short_description(indexed_data):
+    """Test that /search only returns short descriptions when asked to."""
+    with TestClient(app) as client:
+        full = client.get("/search?q=confocal").json()
+        short = client.get("/search?q=confocal&short_description=true").json()
+
+    full_entry = full["hits"][0]["entry"]
+    short_entry = short["hits"][0]["entry"]
+    assert "description_short" not in full_entry
+    assert "description_short" not in short_entry
+    assert short_entry["description"] == full_entry["description"][:500]
+
+
+def test_listing_entry():
+    """Test that a description_short from the index replaces the description."""
+    assert listing_entry({"name": "A", "description_short": "Short"}) == {
+        "name": "A",
+        "description": "Short",
+    }
+    entry = {"name": "A", "description": "Full"}
+    assert listing_entry(entry) is entry
+
+
+def test_parse_combined_aggregate():
+    """Test that "<id>|<label>" buckets are split and merged by id."""
+    aggregations = {
+        "organisms": {
+            "buckets": [
+                {"key": "taxon:1|Mus musculus", "doc_count": 3},
+                {"key": "taxon:2|Homo sapiens", "doc_count": 2},
+                # The same id indexed with a different label
+                {"key": "taxon:1|house mouse", "doc_count": 1},
+                {"key": "taxon:3|", "doc_count": 1},
+            ]
+        }
+    }
+
+    assert parse_combined_aggregate(aggregations, "organisms") == [
+        {"key": "taxon:1", "count": 4, "label": "Mus musculus"},
+        {"key": "taxon:2", "count": 2, "label": "Homo sapiens"},
+        {"key": "taxon:3", "count": 1, "label": None},
+    ]
+    assert parse_combined_aggregate(aggregations, "imaging_methods") == []
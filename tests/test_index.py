@@ -6,6 +6,7 @@ import pytest
 from typer.testing import CliRunner
 
 from gide_search.cli import app
+from gide_search.search.indexer import DatabaseEntryIndexer
 
 runner = CliRunner()
 
@@ -55,3 +56,73 @@ def test_search_command(indexed_data):
 
     assert result.exit_code == 0, f"Search command failed: {result.stdout}"
     assert "Found" in result.stdout, "Expected 'Found' in search output"
+
+
+def test_data_stats_command():
+    """Test the 'gide-search data stats' command on the sample index document."""
+    sample_index_file = (
+        Path(__file__).parent
+        / "data"
+        / "index_document"
+        / "example_ro_crate_index.json"
+    )
+
+    result = runner.invoke(app, ["data", "stats", str(sample_index_file)])
+
+    assert result.exit_code == 0, f"Stats command failed: {result.stdout}"
+    assert "1 datasets" in result.stdout
+    assert "Example Image Database: 1" in result.stdout
+    assert "Mus musculus: 1" in result.stdout
+    assert "confocal microscopy: 1" in result.stdout
+
+
+def test_multi_search(indexed_data):
+    """Test that multi_search returns one response per search body, in order."""
+    indexer = DatabaseEntryIndexer(es_url="http://localhost:9200")
+    search_bodies = [
+        indexer.organism_search_body(["http://purl.obolibrary.org/obo/NCBITaxon_1"]),
+        indexer.imaging_method_search_body(
+            ["http://purl.obolibrary.org/obo/FBbi_00000251"]
+        ),
+        indexer.organism_search_body(
+            ["http://purl.obolibrary.org/obo/NCBITaxon_10090"]
+        ),
+    ]
+
+    # A batch size smaller than the number of searches, so responses span batches
+    responses = indexer.multi_search(search_bodies, batch_size=2)
+
+    assert [len(response["hits"]["hits"]) for response in responses] == [0, 1, 1]
+
+
+def test_iter_search(indexed_data):
+    """Test that iter_search pages through every hit and closes its point in time."""
+    indexer = DatabaseEntryIndexer(es_url="http://localhost:9200")
+
+    # With one hit per page, the sample entry fills the first page, so a second page
+    # is requested with search_after before the results run out
+    hits = list(indexer.iter_search("confocal", page_size=1))
+
+    assert [hit["_id"] for hit in hits] == [
+        "https://example-database.org/studies/EXAMPLE-001"
+    ]
+    search_stats = indexer.es.indices.stats(index=indexer.index_name, metric="search")
+    assert search_stats["_all"]["total"]["search"]["open_contexts"] == 0
+
+
+def test_search_command_all(indexed_data):
+    """Test the 'gide-search search --all' command."""
+    result = runner.invoke(
+        app,
+        [
+            "search",
+            "confocal",
+            "--es-url",
+            "http://localhost:9200",
+            "--all",
+        ],
+    )
+
+    assert result.exit_code == 0, f"Search command failed: {result.stdout}"
+    assert "Found 1 results" in result.stdout
+    assert "https://example-database.org/studies/EXAMPLE-001" in result.stdout
@@ -88,7 +88,7 @@ def test_index_transform_default(tmpdir, monkeypatch):
 
     def mock_ontology_term_finder_init(self):
         self.ebi_client = None
-        self.avaliable_ontology_ids = ["fbbi", "ncbitaxon"]
+        self.avaliable_ontology_ids = {"fbbi", "ncbitaxon"}
 
     monkeypatch.setattr(
         "gide_search.utils.ontology_term_finder.OntologyTermFinder.__init__",
@@ -124,6 +124,105 @@ def test_index_transform_default(tmpdir, monkeypatch):
     assert output_index == expected_index
 
 
+class InProcessExecutor:
+    """Stand-in for ProcessPoolExecutor that runs the work in the test process."""
+
+    instances = []
+
+    def __init__(self, max_workers, initializer):
+        self.max_workers = max_workers
+        self.shut_down = False
+        initializer()
+        InProcessExecutor.instances.append(self)
+
+    def map(self, fn, iterable, chunksize=1):
+        return map(fn, iterable)
+
+    def shutdown(self):
+        self.shut_down = True
+
+
+def test_index_transform_workers(tmpdir, monkeypatch):
+    """Test transformation through the worker pool."""
+
+    def mock_fetch_label_by_iri(self, term_iri: str) -> str | None:
+        if term_iri == "http://purl.obolibrary.org/obo/FBbi_00000251":
+            return "confocal microscopy"
+        if term_iri == "http://purl.obolibrary.org/obo/NCBITaxon_10090":
+            return "Mus musculus"
+        return None
+
+    def mock_ontology_term_finder_init(self):
+        self.ebi_client = None
+        self.avaliable_ontology_ids = {"fbbi", "ncbitaxon"}
+
+    # Real worker processes would only see the mocked ontology lookups if forked, so
+    # the pool runs in process
+    monkeypatch.setattr(InProcessExecutor, "instances", [])
+    monkeypatch.setattr("gide_search.cli.ProcessPoolExecutor", InProcessExecutor)
+    monkeypatch.setattr(
+        "gide_search.utils.ontology_term_finder.OntologyTermFinder.__init__",
+        mock_ontology_term_finder_init,
+    )
+    monkeypatch.setattr(
+        "gide_search.utils.ontology_term_finder.OntologyTermFinder.fetch_label_by_iri",
+        mock_fetch_label_by_iri,
+    )
+
+    example_path = (
+        Path(__file__).parent
+        / "data/gide_search_ro_crate/EXAMPLE-001-ro-crate-metadata.json"
+    )
+    example_ro_crate = example_path.read_text()
+
+    source_dir = tmpdir / "source"
+    source_dir.mkdir()
+    (source_dir / "EXAMPLE-001-ro-crate-metadata.json").write_text(
+        example_ro_crate, encoding="utf-8"
+    )
+    (source_dir / "EXAMPLE-002-ro-crate-metadata.json").write_text(
+        example_ro_crate.replace("EXAMPLE-001", "EXAMPLE-002"), encoding="utf-8"
+    )
+
+    output_dir = tmpdir / "output"
+    output_dir.mkdir()
+
+    result = runner.invoke(
+        app,
+        [
+            "data",
+            "transform-to-index",
+            str(source_dir),
+            "-o",
+            str(output_dir),
+            "--workers",
+            "2",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert len(InProcessExecutor.instances) == 1
+    assert InProcessExecutor.instances[0].max_workers == 2
+    assert InProcessExecutor.instances[0].shut_down
+
+    with open(output_dir / "index.json") as f:
+        index_document = json.load(f)
+
+    expected_index_path = (
+        Path(__file__).parent / "data/index_document/example_ro_crate_index.json"
+    )
+    with open(expected_index_path) as f:
+        expected_index = json.loads(f.read())
+
+    documents = {document["id"]: document for document in index_document}
+    assert len(documents) == 2
+    assert documents[expected_index[0]["id"]] == expected_index[0]
+    assert (
+        documents["https://example-database.org/studies/EXAMPLE-002"]["identifier"]
+        == "EXAMPLE-002"
+    )
+
+
 @pytest.mark.parametrize(
     "taxon_id,expected_id,scientific_name",
     [